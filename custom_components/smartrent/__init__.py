@@ -6,27 +6,62 @@ https://github.com/custom-components/integration_blueprint
 """
 import asyncio
 import logging
+from contextlib import AsyncExitStack
+from datetime import timedelta
+from typing import Optional
 
-from aiohttp.client_exceptions import ClientConnectorError
+from aiohttp.client_exceptions import ClientError
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryAuthFailed, ConfigEntryNotReady
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from smartrent import async_login
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.typing import ConfigType
 from smartrent.api import API
 from smartrent.utils import InvalidAuthError
 
+from .activity import LockActivityLog, async_remove_lock_activity
+from .auth import TokenManager
 from .const import (
+    CONF_COLLECT_METRICS,
+    CONF_DISCOVERY_INTERVAL,
     CONF_PASSWORD,
+    CONF_PERSIST_LOCK_ACTIVITY,
     CONF_TOKEN,
+    CONF_UPDATE_MODE,
     CONF_USERNAME,
+    DEFAULT_DISCOVERY_INTERVAL,
     DOMAIN,
     PLATFORMS,
+    PROFILER_KEY,
+    SIGNAL_DEVICES_ADDED,
     STARTUP_MESSAGE,
+    UPDATE_MODE_PUSH,
 )
+from .hub import SmartRentHub
+from .inventory import DeviceInventory
+from .models import SmartRentData
+from .scheduler import CommandScheduler
+from .services import async_setup_services
+from .session import create_session, session_stats
 
 _LOGGER: logging.Logger = logging.getLogger(__package__)
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+# seconds setup waits for the critical devices to be subscribed. Connects
+# that fail right away fall back to polling within about this long, which
+# also ends the wait, so this only bounds connects that hang.
+STARTUP_TIMEOUT = 15
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the services of the integration."""
+    async_setup_services(hass)
+    return True
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     """Set up this integration using UI."""
@@ -34,26 +69,106 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
         hass.data.setdefault(DOMAIN, {})
         _LOGGER.info(STARTUP_MESSAGE)
 
-    username = entry.data.get(CONF_USERNAME)
-    password = entry.data.get(CONF_PASSWORD)
-    tfa_token = entry.data.get(CONF_TOKEN)
+    credentials = _credentials(entry)
+    username, password, tfa_token = credentials
+
+    # tears down what was started if setup fails part way through
+    async with AsyncExitStack() as cleanup:
+        session = create_session()
+        cleanup.push_async_callback(session.close)
+        api = API(username, password, session, tfa_token)
+        tokens = TokenManager(hass, entry.entry_id)
+        await _async_fetch_devices(api, tokens)
+
+        await tokens.async_save(api.client)
+        tokens.async_start(api.client)
+        cleanup.callback(tokens.async_stop)
+
+        scheduler = CommandScheduler(hass)
+        scheduler.async_start()
+        cleanup.callback(scheduler.async_stop)
+
+        hub = SmartRentHub(hass, api, scheduler)
+        hub.metrics.enabled = entry.options.get(CONF_COLLECT_METRICS, False)
+        hub.profiler = hass.data.get(PROFILER_KEY)
+        update_mode = _update_mode(entry)
+        hub.async_start(push=update_mode == UPDATE_MODE_PUSH)
+        cleanup.callback(hub.async_shutdown)
+
+        activity = LockActivityLog(
+            hass,
+            hub,
+            entry.entry_id,
+            entry.options.get(CONF_PERSIST_LOCK_ACTIVITY, False),
+        )
+        await activity.async_restore()
+        activity.async_track(hub.inventory.get_locks())
+        cleanup.callback(activity.async_shutdown)
+
+        if not await hub.async_wait_ready(STARTUP_TIMEOUT):
+            _LOGGER.warning(
+                "SmartRent locks not subscribed after %ss, continuing in the "
+                "background",
+                STARTUP_TIMEOUT,
+            )
 
-    session = async_get_clientsession(hass)
+        # from here on unloading the entry tears everything down
+        cleanup.pop_all()
+
+    data = SmartRentData(
+        api=api,
+        session=session,
+        hub=hub,
+        scheduler=scheduler,
+        tokens=tokens,
+        activity=activity,
+        credentials=credentials,
+        update_mode=update_mode,
+    )
+    hass.data[DOMAIN][entry.entry_id] = data
+
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+
+    _async_schedule_discovery(hass, entry, data)
+
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+    return True
+
+
+async def _async_fetch_devices(api: API, tokens: TokenManager) -> None:
+    """Log in, reusing stored tokens, and fetch the devices of the account."""
     try:
-        api = await async_login(username, password, session, tfa_token=tfa_token)
+        if not await tokens.async_restore(api.client):
+            await api.async_fetch_devices()
+            return
+
+        _LOGGER.debug("Reusing stored SmartRent session")
+        try:
+            await api.async_fetch_devices()
+        except InvalidAuthError:
+            _LOGGER.debug("Stored SmartRent session was rejected, logging in again")
+            await tokens.async_discard(api.client)
+            await api.async_fetch_devices()
     except InvalidAuthError as exception:
         raise ConfigEntryAuthFailed("Credentials expired!") from exception
-    except ClientConnectorError as exception:
+    except (ClientError, asyncio.TimeoutError) as exception:
         raise ConfigEntryNotReady from exception
     except EOFError as exception:
         raise ConfigEntryAuthFailed("TFA not supplied. Please Reauth!") from exception
 
-    hass.data[DOMAIN][entry.entry_id] = api
 
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+def _credentials(entry: ConfigEntry) -> tuple[str, str, Optional[str]]:
+    """Return the username, password and tfa token of an entry."""
+    return (
+        entry.data[CONF_USERNAME],
+        entry.data[CONF_PASSWORD],
+        entry.data.get(CONF_TOKEN),
+    )
 
-    entry.add_update_listener(async_reload_entry)
-    return True
+
+def _update_mode(entry: ConfigEntry) -> str:
+    """Return whether devices of an entry are pushed or polled."""
+    return entry.options.get(CONF_UPDATE_MODE, UPDATE_MODE_PUSH)
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -66,9 +181,17 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             ]
         )
     )
-    api: API = hass.data[DOMAIN][entry.entry_id]
-    for device in api.get_device_list():
-        device.stop_updater()
+    data: SmartRentData = hass.data[DOMAIN][entry.entry_id]
+    if data.cancel_discovery:
+        data.cancel_discovery()
+    data.activity.async_shutdown()
+    await data.activity.async_save()
+    data.hub.async_shutdown()
+    data.scheduler.async_stop()
+    data.tokens.async_stop()
+    await data.tokens.async_save(data.api.client)
+    _LOGGER.debug("SmartRent connection pool: %s", session_stats(data.session))
+    await data.session.close()
 
     if unloaded:
         hass.data[DOMAIN].pop(entry.entry_id)
@@ -76,7 +199,86 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return unloaded
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Forget the stored session and lock activity of a removed entry."""
+    await TokenManager(hass, entry.entry_id).async_remove()
+    await async_remove_lock_activity(hass, entry.entry_id)
+
+
 async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Reload config entry."""
-    await async_unload_entry(hass, entry)
-    await async_setup_entry(hass, entry)
+    """Reload config entry.
+
+    As long as the credentials, the metrics option and the update mode did
+    not change the running session is kept, options are applied and only
+    devices that were added or removed on SmartRent's side are updated.
+    """
+    data: Optional[SmartRentData] = hass.data[DOMAIN].get(entry.entry_id)
+    if (
+        data is None
+        or data.credentials != _credentials(entry)
+        # the metrics sensors only exist while metrics are collected
+        or data.hub.metrics.enabled != entry.options.get(CONF_COLLECT_METRICS, False)
+        or data.update_mode != _update_mode(entry)
+    ):
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+
+    data.activity.persist = entry.options.get(CONF_PERSIST_LOCK_ACTIVITY, False)
+    _async_schedule_discovery(hass, entry, data)
+    await _async_discover_devices(hass, entry, data)
+
+
+@callback
+def _async_schedule_discovery(
+    hass: HomeAssistant, entry: ConfigEntry, data: SmartRentData
+) -> None:
+    """(Re)start periodic device discovery with the interval from the options."""
+    if data.cancel_discovery:
+        data.cancel_discovery()
+        data.cancel_discovery = None
+
+    minutes = entry.options.get(CONF_DISCOVERY_INTERVAL, DEFAULT_DISCOVERY_INTERVAL)
+    if not minutes:
+        return
+
+    async def _async_discover(_now) -> None:
+        await _async_discover_devices(hass, entry, data)
+
+    data.cancel_discovery = async_track_time_interval(
+        hass, _async_discover, timedelta(minutes=minutes)
+    )
+
+
+async def _async_discover_devices(
+    hass: HomeAssistant, entry: ConfigEntry, data: SmartRentData
+) -> None:
+    """Run one device discovery pass, logging instead of raising on failure."""
+    try:
+        await async_sync_devices(hass, entry, data)
+    except (ClientError, asyncio.TimeoutError, InvalidAuthError) as exc:
+        _LOGGER.warning("Device discovery failed: %r", exc)
+
+
+async def async_sync_devices(
+    hass: HomeAssistant, entry: ConfigEntry, data: SmartRentData
+) -> None:
+    """Add entities for new devices and remove the ones of departed devices."""
+    added, removed = await data.hub.async_refresh_devices()
+
+    inventory = DeviceInventory(added)
+    data.activity.async_untrack(removed)
+    data.activity.async_track(inventory.get_locks())
+
+    device_registry = dr.async_get(hass)
+    for device_id in removed:
+        if device_entry := device_registry.async_get_device(
+            identifiers={("id", device_id)}
+        ):
+            device_registry.async_update_device(
+                device_entry.id, remove_config_entry_id=entry.entry_id
+            )
+
+    if added:
+        async_dispatcher_send(
+            hass, SIGNAL_DEVICES_ADDED.format(entry.entry_id), inventory
+        )
@@ -0,0 +1,235 @@
+"""Lock activity parsed from SmartRent lock notifications."""
+import logging
+import re
+from collections import deque
+from functools import lru_cache, partial
+from typing import Any, Callable, NamedTuple, Optional
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+from smartrent import DoorLock
+
+from .const import DOMAIN
+from .hub import SmartRentHub
+
+_LOGGER = logging.getLogger(__name__)
+
+EVENT_LOCK_ACTIVITY = f"{DOMAIN}_lock_activity"
+
+HISTORY_SIZE = 100
+STORAGE_VERSION = 1
+# seconds to collect activity before writing it to storage
+SAVE_DELAY = 10
+
+# Z-Wave alarm types reported by the locks
+ALARM_JAMMED = 9
+ALARM_METHODS = {
+    18: "keypad",
+    19: "keypad",
+    21: "manual",
+    22: "manual",
+    24: "remote",
+    25: "remote",
+    27: "auto",
+}
+
+_ALARM_TYPE = re.compile(r"ALARM_TYPE_(\d+)")
+_USER = re.compile(r"ALARM_LEVEL_(\d+)|user\D{0,3}(\d+)", re.IGNORECASE)
+
+
+class LockNotification(NamedTuple):
+    """The parts of a lock notification string."""
+
+    raw: Optional[str]
+    alarm_code: Optional[int]
+    user: Optional[int]
+    method: Optional[str]
+
+    @property
+    def jammed(self) -> bool:
+        return self.alarm_code == ALARM_JAMMED
+
+
+@lru_cache(maxsize=256)
+def parse_notification(raw: Optional[str]) -> LockNotification:
+    """Parse a notification; locks repeat the same few, so results are cached."""
+    if not raw:
+        return LockNotification(raw, None, None, None)
+
+    alarm_code = None
+    if match := _ALARM_TYPE.search(raw):
+        alarm_code = int(match.group(1))
+
+    user = None
+    if match := _USER.search(raw):
+        user = int(match.group(1) or match.group(2))
+
+    method = ALARM_METHODS.get(alarm_code) if alarm_code is not None else None
+    return LockNotification(raw, alarm_code, user, method)
+
+
+def _index_store(hass: HomeAssistant, entry_id: str) -> Store:
+    """Return the store listing the locks that have stored activity."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.lock_activity")
+
+
+def _lock_store(hass: HomeAssistant, entry_id: str, device_id: int) -> Store:
+    return Store(
+        hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.lock_activity.{device_id}"
+    )
+
+
+async def async_remove_lock_activity(hass: HomeAssistant, entry_id: str) -> None:
+    """Delete the stored lock activity of an entry."""
+    index = _index_store(hass, entry_id)
+    if stored := await index.async_load():
+        for device_id in stored["locks"]:
+            await _lock_store(hass, entry_id, device_id).async_remove()
+    await index.async_remove()
+
+
+class LockActivityLog:
+    """Keeps the latest activity of every lock of an entry.
+
+    Each notification SmartRent pushes is parsed, fired as a
+    ``smartrent_lock_activity`` event and added to a ring buffer of
+    ``HISTORY_SIZE`` entries per lock. Pushed notifications are all
+    recorded, also when a lock repeats the previous one. Polls and resyncs
+    carry no events, a notification they show is recorded if it differs
+    from the last one.
+
+    With ``persist`` the buffers are restored on startup. Every lock is
+    stored on its own and written a few seconds after it had new activity,
+    so busy locks do not rewrite the history of all the others.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, hub: SmartRentHub, entry_id: str, persist: bool
+    ) -> None:
+        self.hass = hass
+        self.hub = hub
+        self.entry_id = entry_id
+        self.persist = persist
+        self._index: Store[dict[str, list[int]]] = _index_store(hass, entry_id)
+        self._stores: dict[int, Store[list[dict[str, Any]]]] = {}
+        self._history: dict[int, deque[dict[str, Any]]] = {}
+        # locks with activity that was not written yet
+        self._unsaved: set[int] = set()
+        # last notification seen per lock, polls show the same one repeatedly
+        self._last: dict[int, Optional[str]] = {}
+        self._unsubs: dict[int, list[Callable[[], None]]] = {}
+
+    def _store(self, device_id: int) -> Store[list[dict[str, Any]]]:
+        if (store := self._stores.get(device_id)) is None:
+            store = self._stores[device_id] = _lock_store(
+                self.hass, self.entry_id, device_id
+            )
+        return store
+
+    async def async_restore(self) -> None:
+        """Load the stored history, if it is persisted."""
+        if not self.persist or not (stored := await self._index.async_load()):
+            return
+
+        for device_id in stored["locks"]:
+            if events := await self._store(device_id).async_load():
+                self._history[device_id] = deque(events, maxlen=HISTORY_SIZE)
+
+    async def async_save(self) -> None:
+        """Write the locks with new activity right away, if it is persisted."""
+        if not self.persist:
+            return
+
+        for device_id in list(self._unsaved):
+            await self._store(device_id).async_save(self._lock_data(device_id))
+        await self._index.async_save(self._index_data())
+
+    @callback
+    def async_track(self, locks: list[DoorLock]) -> None:
+        """Start recording the notifications of locks."""
+        for lock in locks:
+            if lock._device_id in self._unsubs:
+                continue
+
+            self._last[lock._device_id] = lock.get_notification()
+            self._unsubs[lock._device_id] = [
+                self.hub.async_add_event_listener(
+                    lock._device_id,
+                    lambda event, lock=lock: self._async_event(lock, event),
+                ),
+                self.hub.async_add_listener(
+                    lock._device_id,
+                    ("notification",),
+                    lambda lock=lock: self._async_changed(lock),
+                ),
+            ]
+
+    @callback
+    def async_untrack(self, device_ids: list[int]) -> None:
+        """Stop recording the notifications of removed locks."""
+        for device_id in device_ids:
+            self._last.pop(device_id, None)
+            for unsub in self._unsubs.pop(device_id, ()):
+                unsub()
+
+    @callback
+    def async_shutdown(self) -> None:
+        self.async_untrack(list(self._unsubs))
+
+    def get(self, device_id: int, limit: int = HISTORY_SIZE) -> list[dict[str, Any]]:
+        """Return the latest activity of a lock, newest first."""
+        history = self._history.get(device_id, ())
+        return list(reversed(history))[:limit]
+
+    @callback
+    def _async_event(self, lock: DoorLock, event: dict[str, Any]) -> None:
+        """Record a pushed notification, even one the lock sent before."""
+        if event.get("name") == "notifications" and (
+            raw := event.get("last_read_state")
+        ):
+            self._async_record(lock, raw)
+
+    @callback
+    def _async_changed(self, lock: DoorLock) -> None:
+        """Record a notification that changed without being pushed."""
+        # pushed ones were recorded before they were applied to the lock
+        raw = lock.get_notification()
+        if raw is not None and raw != self._last.get(lock._device_id):
+            self._async_record(lock, raw)
+
+    @callback
+    def _async_record(self, lock: DoorLock, raw: str) -> None:
+        """Record a notification of lock."""
+        device_id = lock._device_id
+        self._last[device_id] = raw
+        notification = parse_notification(raw)
+
+        activity = {
+            "time": dt_util.utcnow().isoformat(),
+            "device_id": device_id,
+            "name": lock._name,
+            **notification._asdict(),
+            "jammed": notification.jammed,
+        }
+        if (history := self._history.get(device_id)) is None:
+            history = self._history[device_id] = deque(maxlen=HISTORY_SIZE)
+            if self.persist:
+                self._index.async_delay_save(self._index_data, SAVE_DELAY)
+        history.append(activity)
+
+        self.hass.bus.async_fire(EVENT_LOCK_ACTIVITY, activity)
+        if self.persist:
+            self._unsaved.add(device_id)
+            self._store(device_id).async_delay_save(
+                partial(self._lock_data, device_id), SAVE_DELAY
+            )
+
+    @callback
+    def _lock_data(self, device_id: int) -> list[dict[str, Any]]:
+        self._unsaved.discard(device_id)
+        return list(self._history.get(device_id, ()))
+
+    @callback
+    def _index_data(self) -> dict[str, list[int]]:
+        return {"locks": sorted(self._history)}
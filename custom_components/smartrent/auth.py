@@ -0,0 +1,124 @@
+"""Persistence of SmartRent session tokens between restarts."""
+import asyncio
+import logging
+import time
+from typing import Optional, TypedDict
+
+from aiohttp import ClientError
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
+from smartrent import Client
+from smartrent.utils import InvalidAuthError
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+# refresh this long before the access token expires. the client refuses to
+# refresh tokens that are valid for more than another 60 seconds
+REFRESH_MARGIN_SECONDS = 30
+# retry interval when a proactive refresh fails
+REFRESH_RETRY_SECONDS = 300
+
+
+class StoredTokens(TypedDict):
+    access_token: str
+    refresh_token: str
+    expires: int
+
+
+class TokenManager:
+    """Saves the tokens of a ``Client`` and refreshes them before they expire.
+
+    Tokens are stored per config entry, so a restart or reload can reuse them
+    instead of logging in with email and password again.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        self.hass = hass
+        self._store: Store[StoredTokens] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.tokens"
+        )
+        self._client: Optional[Client] = None
+        self._unsub_refresh: Optional[CALLBACK_TYPE] = None
+
+    async def async_restore(self, client: Client) -> bool:
+        """Load stored tokens into the client. Returns True if there were any."""
+        if not (tokens := await self._store.async_load()):
+            return False
+
+        client._token = tokens["access_token"]
+        client._refresh_token = tokens["refresh_token"]
+        client._token_exp_time = tokens["expires"]
+        return True
+
+    async def async_discard(self, client: Client) -> None:
+        """Drop restored tokens SmartRent rejected, so the client logs in again.
+
+        The client only refreshes tokens that are about to expire, so it keeps
+        using a revoked token for as long as it would have been valid.
+        """
+        client._token = None
+        client._refresh_token = None
+        client._token_exp_time = None
+        await self._store.async_remove()
+
+    async def async_save(self, client: Client) -> None:
+        """Store the current tokens of the client."""
+        if not client._token:
+            return
+
+        await self._store.async_save(
+            StoredTokens(
+                access_token=client._token,
+                refresh_token=client._refresh_token,
+                expires=client._token_exp_time,
+            )
+        )
+
+    async def async_remove(self) -> None:
+        """Forget the stored tokens."""
+        await self._store.async_remove()
+
+    @callback
+    def async_start(self, client: Client) -> None:
+        """Keep the tokens of client fresh until ``async_stop`` is called."""
+        self._client = client
+        self._async_schedule_refresh()
+
+    @callback
+    def async_stop(self) -> None:
+        """Cancel the scheduled refresh."""
+        if self._unsub_refresh:
+            self._unsub_refresh()
+            self._unsub_refresh = None
+
+    @callback
+    def _async_schedule_refresh(self, delay: Optional[float] = None) -> None:
+        """Schedule the next refresh shortly before the access token expires."""
+        self.async_stop()
+        if delay is None:
+            expires = (self._client and self._client._token_exp_time) or 0
+            delay = max(expires - time.time() - REFRESH_MARGIN_SECONDS, 0)
+
+        self._unsub_refresh = async_call_later(self.hass, delay, self._async_refresh)
+
+    async def _async_refresh(self, _now=None) -> None:
+        """Refresh the tokens, falling back to email login inside the client."""
+        self._unsub_refresh = None
+        client = self._client
+        if client is None:
+            return
+
+        try:
+            await client._async_refresh_token()
+        except (ClientError, asyncio.TimeoutError, InvalidAuthError, EOFError) as exc:
+            _LOGGER.warning("Could not refresh SmartRent tokens: %r", exc)
+            self._async_schedule_refresh(REFRESH_RETRY_SECONDS)
+            return
+
+        await self.async_save(client)
+        self._async_schedule_refresh()
@@ -1,9 +1,12 @@
 """Platform for climate integration."""
+import asyncio
 import logging
-from typing import Optional
+from functools import partial
+from typing import Any, NamedTuple, Optional
 
 from homeassistant.components.climate import ClimateEntity
 from homeassistant.components.climate.const import (
+    ATTR_HVAC_MODE,
     FAN_AUTO,
     FAN_ON,
     ClimateEntityFeature,
@@ -11,10 +14,14 @@ from homeassistant.components.climate.const import (
     HVACMode,
 )
 from homeassistant.const import ATTR_TEMPERATURE, UnitOfTemperature
-from homeassistant.helpers.device_registry import DeviceEntryType
+from homeassistant.core import callback
 from smartrent import Thermostat
 
-from .const import CONFIGURATION_URL, DOMAIN, PROPER_NAME
+from .commands import CommandQueue
+from .entity import SmartRentEntity, async_add_device_entities
+from .hub import SmartRentHub
+from .inventory import DeviceInventory
+from .scheduler import PRIORITY_CLIMATE
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -42,48 +49,134 @@ SMARTRENT_FAN_TO_HA = {value: key for key, value in HA_FAN_TO_SMART_RENT.items()
 SUPPORT_FAN = [FAN_ON, FAN_AUTO]
 SUPPORT_HVAC = [HVACMode.HEAT, HVACMode.COOL, HVACMode.OFF, HVACMode.HEAT_COOL]
 
+# seconds to wait for more changes before sending thermostat commands,
+# so dragging a setpoint slider results in a single command
+COMMAND_DELAY = 1.0
+
 
 async def async_setup_entry(hass, entry, async_add_entities):
     """Setup climate platform."""
-    client = hass.data[DOMAIN][entry.entry_id]
-    thermostats = client.get_thermostats()
-    for thermostat in thermostats:
-        async_add_entities([SmartrentThermostat(thermostat)])
-
-
-class SmartrentThermostat(ClimateEntity):
-    def __init__(self, thermo: Thermostat) -> None:
-        super().__init__()
-        self.device = thermo
-
-        self.device.start_updater()
-        self.device.set_update_callback(self.async_schedule_update_ha_state)
-
-    @property
-    def should_poll(self):
-        """Return the polling state, if needed."""
-        return False
-
-    @property
-    def unique_id(self):
-        """Return a unique ID."""
-        return self.device._device_id
+    async_add_device_entities(hass, entry, async_add_entities, _build_thermostats)
+
+
+class ThermostatState(NamedTuple):
+    """Climate state derived from a single read of the thermostat fields."""
+
+    supported_features: ClimateEntityFeature
+    current_temperature: Optional[float]
+    current_humidity: Optional[float]
+    target_temperature: Optional[float]
+    target_temperature_high: Optional[float]
+    target_temperature_low: Optional[float]
+    hvac_mode: Optional[HVACMode]
+    hvac_action: Optional[HVACAction]
+    fan_mode: Optional[str]
+
+
+def _build_thermostats(
+    hub: SmartRentHub, inventory: DeviceInventory
+) -> list["SmartrentThermostat"]:
+    """Create the thermostats for the devices in inventory."""
+    return [
+        SmartrentThermostat(hub, thermostat)
+        for thermostat in inventory.get_thermostats()
+    ]
+
+
+class SmartrentThermostat(SmartRentEntity, ClimateEntity):
+    device_fields = (
+        "mode",
+        "fan_mode",
+        "operating_state",
+        "current_temp",
+        "current_humidity",
+        "cooling_setpoint",
+        "heating_setpoint",
+    )
+
+    command_priority = PRIORITY_CLIMATE
+
+    def __init__(self, hub: SmartRentHub, thermo: Thermostat) -> None:
+        super().__init__(hub, thermo)
+
+        # created on the first command, most thermostats rarely get any
+        self._commands: Optional[CommandQueue] = None
+        self._snapshot: Optional[ThermostatState] = None
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Drop commands that were not sent yet."""
+        await super().async_will_remove_from_hass()
+        if self._commands:
+            self._commands.async_cancel()
+
+    def _get(self, field: str) -> Any:
+        """Return a device field, preferring a value that is waiting to be sent."""
+        if self._commands and field in self._commands:
+            return self._commands.get(field)
+        return getattr(self.device, f"get_{field}")()
+
+    def _command_queue(self) -> CommandQueue:
+        """Return the command queue, creating it on first use."""
+        if self._commands is None:
+            thermo = self.device
+            self._commands = CommandQueue(
+                self.hass,
+                COMMAND_DELAY,
+                {
+                    "mode": partial(self.async_send_command, thermo.async_set_mode),
+                    "fan_mode": partial(
+                        self.async_send_command, thermo.async_set_fan_mode
+                    ),
+                    "cooling_setpoint": partial(
+                        self.async_send_command, thermo.async_set_cooling_setpoint
+                    ),
+                    "heating_setpoint": partial(
+                        self.async_send_command, thermo.async_set_heating_setpoint
+                    ),
+                },
+                self._async_commands_sent,
+            )
+        return self._commands
+
+    async def _async_send(self, **commands: Any) -> None:
+        """Queue commands, show their values right away and wait until sent."""
+        queue = self._command_queue()
+        waiters = [queue.async_set(key, value) for key, value in commands.items()]
+        self._snapshot = None
+        self.async_write_ha_state()
+        await asyncio.gather(*waiters)
+
+    @callback
+    def _async_commands_sent(self) -> None:
+        """Write the state the device reports after sending commands."""
+        self._snapshot = None
+        if self.hass is not None:
+            self.async_write_ha_state()
+
+    @callback
+    def _async_device_updated(self) -> None:
+        """Drop the derived state, the device reported new data."""
+        self._snapshot = None
+        super()._async_device_updated()
 
     @property
-    def name(self):
-        """Return the display name of this thermostat."""
-        return self.device._name
-
-    @property
-    def supported_features(self):
-        """Return the list of supported features."""
+    def _state(self) -> ThermostatState:
+        """Return the derived state, computing it once per update."""
+        if self._snapshot is None:
+            self._snapshot = self._compute_state()
+        return self._snapshot
+
+    def _compute_state(self) -> ThermostatState:
+        """Read every thermostat field once and derive the climate state."""
+        mode = self._get("mode")
+        fan_mode = self._get("fan_mode")
+        cooling_setpoint = self._get("cooling_setpoint")
+        heating_setpoint = self._get("heating_setpoint")
+        current_temp = self.device.get_current_temp()
 
         # binary list of supported features
         supports_features = ClimateEntityFeature.TURN_ON | ClimateEntityFeature.TURN_OFF
 
-        fan_mode = self.device.get_fan_mode()
-        mode = self.device.get_mode()
-
         if mode in ["auto", "off"]:
             supports_features |= ClimateEntityFeature.TARGET_TEMPERATURE_RANGE
 
@@ -94,7 +187,31 @@ class SmartrentThermostat(ClimateEntity):
         if fan_mode:
             supports_features |= ClimateEntityFeature.FAN_MODE
 
-        return supports_features
+        if mode == "cool":
+            target_temperature = cooling_setpoint
+        elif mode == "heat":
+            target_temperature = heating_setpoint
+        else:
+            target_temperature = current_temp
+
+        return ThermostatState(
+            supported_features=supports_features,
+            current_temperature=current_temp,
+            current_humidity=self.device.get_current_humidity(),
+            target_temperature=target_temperature,
+            target_temperature_high=cooling_setpoint,
+            target_temperature_low=heating_setpoint,
+            hvac_mode=SMARTRENT_HVAC_MODE_TO_HA.get(mode),
+            hvac_action=SMARTRENT_HVAC_ACTION_TO_HA.get(
+                self.device.get_operating_state()
+            ),
+            fan_mode=SMARTRENT_FAN_TO_HA.get(fan_mode),
+        )
+
+    @property
+    def supported_features(self):
+        """Return the list of supported features."""
+        return self._state.supported_features
 
     @property
     def temperature_unit(self):
@@ -103,25 +220,20 @@ class SmartrentThermostat(ClimateEntity):
 
     @property
     def current_temperature(self):
-        return self.device.get_current_temp()
+        return self._state.current_temperature
 
     @property
     def target_temperature_high(self):
-        return self.device.get_cooling_setpoint()
+        return self._state.target_temperature_high
 
     @property
     def target_temperature_low(self):
-        return self.device.get_heating_setpoint()
+        return self._state.target_temperature_low
 
     @property
     def target_temperature(self):
         """Return the temperature we try to reach."""
-        if self.device.get_mode() == "cool":
-            return self.device.get_cooling_setpoint()
-        elif self.device.get_mode() == "heat":
-            return self.device.get_heating_setpoint()
-        else:
-            return self.device.get_current_temp()
+        return self._state.target_temperature
 
     @property
     def target_temperature_step(self):
@@ -140,14 +252,12 @@ class SmartrentThermostat(ClimateEntity):
 
     @property
     def current_humidity(self):
-        return self.device.get_current_humidity()
+        return self._state.current_humidity
 
     @property
     def hvac_mode(self):
         """Return current operation ie. heat, cool, idle."""
-        smartrent_hvac_mode = self.device.get_mode()
-
-        return SMARTRENT_HVAC_MODE_TO_HA.get(smartrent_hvac_mode, None)
+        return self._state.hvac_mode
 
     @property
     def hvac_modes(self):
@@ -158,54 +268,48 @@ class SmartrentThermostat(ClimateEntity):
         """Set new target operation mode."""
         smartrent_hvac_mode = HA_HVAC_MODE_TO_SMARTRENT.get(hvac_mode)
 
-        await self.device.async_set_mode(smartrent_hvac_mode)
+        await self._async_send(mode=smartrent_hvac_mode)
 
     @property
     def hvac_action(self) -> Optional[HVACAction]:
         """Return the current running hvac operation ie. cooling, heating, off"""
-        return SMARTRENT_HVAC_ACTION_TO_HA.get(self.device.get_operating_state())
+        return self._state.hvac_action
 
     async def async_set_temperature(self, **kwargs):
+        commands = {}
+
+        if hvac_mode := kwargs.get(ATTR_HVAC_MODE):
+            commands["mode"] = HA_HVAC_MODE_TO_SMARTRENT.get(hvac_mode)
+
         temperature = kwargs.get(ATTR_TEMPERATURE)
         if temperature:
-            if self.device.get_mode() == "cool":
-                await self.device.async_set_cooling_setpoint(temperature)
+            if commands.get("mode", self._get("mode")) == "cool":
+                commands["cooling_setpoint"] = temperature
             else:
-                await self.device.async_set_heating_setpoint(temperature)
+                commands["heating_setpoint"] = temperature
 
         tt_high = kwargs.get("target_temp_high")
         if tt_high:
-            await self.device.async_set_cooling_setpoint(tt_high)
+            commands["cooling_setpoint"] = tt_high
 
         tt_low = kwargs.get("target_temp_low")
         if tt_low:
-            await self.device.async_set_heating_setpoint(tt_low)
+            commands["heating_setpoint"] = tt_low
+
+        await self._async_send(**commands)
 
     @property
     def fan_mode(self):
         """Return the fan setting."""
-        smartrent_fan_mode = self.device.get_fan_mode()
-
-        return SMARTRENT_FAN_TO_HA.get(smartrent_fan_mode, None)
+        return self._state.fan_mode
 
     async def async_set_fan_mode(self, fan_mode):
         """Set fan mode."""
         smartrent_fan_mode = HA_FAN_TO_SMART_RENT.get(fan_mode)
 
-        await self.device.async_set_fan_mode(smartrent_fan_mode)
+        await self._async_send(fan_mode=smartrent_fan_mode)
 
     @property
     def fan_modes(self):
         """List of available fan modes."""
         return SUPPORT_FAN
-
-    @property
-    def device_info(self):
-        return dict(
-            identifiers={("id", self.device._device_id)},
-            name=str(self.name),
-            manufacturer=PROPER_NAME,
-            model=str(self.device.__class__.__name__),
-            entry_type=DeviceEntryType.SERVICE,
-            configuration_url=CONFIGURATION_URL,
-        )
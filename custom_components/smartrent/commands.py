@@ -0,0 +1,118 @@
+"""Coalescing of bursts of device commands."""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Optional
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class CommandQueue:
+    """Collects commands for one device and sends only the latest of each.
+
+    Commands are keyed by the attribute they set. A newer value for an
+    attribute replaces the pending one, and every new command restarts the
+    delay. Once no command arrived for ``delay`` seconds the pending commands
+    are sent concurrently, since each of them sets a different attribute.
+    Values stay visible through ``get`` until they were sent and
+    ``on_flushed`` ran, so entities keep showing them while in flight.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        delay: float,
+        senders: dict[str, Callable[[Any], Awaitable[None]]],
+        on_flushed: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self.hass = hass
+        self.delay = delay
+        self._senders = senders
+        self._on_flushed = on_flushed
+
+        self._pending: dict[str, Any] = {}
+        # commands of flushes that are still being sent, oldest first
+        self._in_flight: list[dict[str, Any]] = []
+        self._waiters: dict[str, list[asyncio.Future[None]]] = {}
+        self._unsub_flush: Optional[CALLBACK_TYPE] = None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the latest value queued or being sent for key, if any."""
+        if key in self._pending:
+            return self._pending[key]
+        for commands in reversed(self._in_flight):
+            if key in commands:
+                return commands[key]
+        return default
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._pending or any(
+            key in commands for commands in self._in_flight
+        )
+
+    def is_queued(self, key: str) -> bool:
+        """Return True if a value for key waits for the delay to pass."""
+        return key in self._pending
+
+    @callback
+    def async_set(self, key: str, value: Any) -> "asyncio.Future[None]":
+        """Queue a command.
+
+        The returned future is done once the value that won for key was sent.
+        """
+        self._pending[key] = value
+        waiter = self.hass.loop.create_future()
+        self._waiters.setdefault(key, []).append(waiter)
+
+        if self._unsub_flush:
+            self._unsub_flush()
+        self._unsub_flush = async_call_later(self.hass, self.delay, self._async_flush)
+
+        return waiter
+
+    async def _async_flush(self, _now=None) -> None:
+        """Send every pending command."""
+        self._unsub_flush = None
+        pending, self._pending = self._pending, {}
+        waiters, self._waiters = self._waiters, {}
+        self._in_flight.append(pending)
+
+        _LOGGER.debug("Sending coalesced commands %s", pending)
+        try:
+            results = await asyncio.gather(
+                *[self._senders[key](value) for key, value in pending.items()],
+                return_exceptions=True,
+            )
+        finally:
+            # by identity, a later flush may hold equal commands
+            self._in_flight = [
+                commands for commands in self._in_flight if commands is not pending
+            ]
+
+        for key, result in zip(pending, results):
+            for waiter in waiters[key]:
+                if waiter.done():
+                    continue
+                if isinstance(result, BaseException):
+                    waiter.set_exception(result)
+                else:
+                    waiter.set_result(None)
+
+        if self._on_flushed:
+            self._on_flushed()
+
+    @callback
+    def async_cancel(self) -> None:
+        """Drop pending commands without sending them."""
+        if self._unsub_flush:
+            self._unsub_flush()
+            self._unsub_flush = None
+
+        for waiters in self._waiters.values():
+            for waiter in waiters:
+                waiter.cancel()
+
+        self._pending.clear()
+        self._waiters.clear()
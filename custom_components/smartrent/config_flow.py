@@ -6,11 +6,22 @@ from typing import Any, Mapping, Optional
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.const import CONF_PASSWORD, CONF_TOKEN, CONF_USERNAME
-from homeassistant.helpers import aiohttp_client
-from smartrent import async_login
+from homeassistant.core import callback
+from smartrent import Client
 from smartrent.utils import InvalidAuthError
 
-from .const import DOMAIN
+from .auth import TokenManager
+from .const import (
+    CONF_COLLECT_METRICS,
+    CONF_DISCOVERY_INTERVAL,
+    CONF_PERSIST_LOCK_ACTIVITY,
+    CONF_UPDATE_MODE,
+    DEFAULT_DISCOVERY_INTERVAL,
+    DOMAIN,
+    UPDATE_MODE_POLL,
+    UPDATE_MODE_PUSH,
+)
+from .session import create_session
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -26,6 +37,14 @@ SMARTRENT_SCHEMA = vol.Schema(
 class SmartRentFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):  # type: ignore
     """Handle a SmartRent config flow."""
 
+    _client: Optional[Client] = None
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        """Get the options flow for this handler."""
+        return SmartRentOptionsFlowHandler(config_entry)
+
     async def _show_form(self, step_id="", errors=None):
         """Show the form to the user."""
         return self.async_show_form(
@@ -36,12 +55,14 @@ class SmartRentFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):  # type: i
         self, user_input: Mapping[str, Any]
     ) -> Optional[dict[str, str]]:
         """Check to see if provided creds are accepted by SmartRent"""
-        session = aiohttp_client.async_get_clientsession(self.hass)
         try:
             username = user_input[CONF_USERNAME]
             password = user_input[CONF_PASSWORD]
             tfa_token = user_input.get(CONF_TOKEN)
-            await async_login(username, password, session, tfa_token=tfa_token)
+            # fetching tokens is enough to validate, no need to list devices
+            async with create_session() as session:
+                client = Client(username, password, session, tfa_token)
+                await client._async_refresh_token()
         except InvalidAuthError as exc:
             _LOGGER.error(f"Invalid auth: {exc}")
             return {"base": "invalid_auth"}
@@ -49,6 +70,7 @@ class SmartRentFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):  # type: i
             _LOGGER.error(f"EOFError: {exc}")
             return {"base": "tfa_not_provided"}
 
+        self._client = client
         return {}
 
     async def async_step_import(self, import_config):
@@ -65,6 +87,9 @@ class SmartRentFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):  # type: i
             return await self._show_form(step_id="reauth", errors=errors)
 
         if entry := await self.async_set_unique_id(self.unique_id):
+            # let the reloaded entry reuse the session we just logged in with
+            if self._client:
+                await TokenManager(self.hass, entry.entry_id).async_save(self._client)
             self.hass.config_entries.async_update_entry(entry, data=user_input)
             self.hass.async_create_task(
                 self.hass.config_entries.async_reload(entry.entry_id)
@@ -85,3 +110,41 @@ class SmartRentFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):  # type: i
 
         _LOGGER.info("created entry!")
         return self.async_create_entry(title=user_input[CONF_USERNAME], data=user_input)
+
+
+class SmartRentOptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle SmartRent options."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        self._entry = config_entry
+
+    async def async_step_init(self, user_input=None):
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        discovery_interval = self._entry.options.get(
+            CONF_DISCOVERY_INTERVAL, DEFAULT_DISCOVERY_INTERVAL
+        )
+        collect_metrics = self._entry.options.get(CONF_COLLECT_METRICS, False)
+        persist_lock_activity = self._entry.options.get(
+            CONF_PERSIST_LOCK_ACTIVITY, False
+        )
+        update_mode = self._entry.options.get(CONF_UPDATE_MODE, UPDATE_MODE_PUSH)
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_DISCOVERY_INTERVAL, default=discovery_interval
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                    vol.Optional(CONF_COLLECT_METRICS, default=collect_metrics): bool,
+                    vol.Optional(
+                        CONF_PERSIST_LOCK_ACTIVITY, default=persist_lock_activity
+                    ): bool,
+                    vol.Optional(CONF_UPDATE_MODE, default=update_mode): vol.In(
+                        [UPDATE_MODE_PUSH, UPDATE_MODE_POLL]
+                    ),
+                }
+            ),
+        )
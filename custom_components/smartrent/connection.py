@@ -0,0 +1,379 @@
+"""Supervised websocket connection for SmartRent push updates."""
+import asyncio
+import json
+import logging
+import random
+import time
+from collections import defaultdict
+from functools import partial
+from typing import TYPE_CHECKING, Any, Optional, Sequence, Union
+
+import websockets
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from smartrent import (
+    BinarySwitch,
+    Client,
+    DoorLock,
+    MultilevelSwitch,
+    Sensor,
+    Thermostat,
+)
+from smartrent.utils import JOINER_PAYLOAD, SMARTRENT_WEBSOCKET_URI
+
+from .inventory import SmartRentDevice
+
+if TYPE_CHECKING:
+    from .hub import SmartRentHub
+
+_LOGGER = logging.getLogger(__name__)
+
+HEARTBEAT_INTERVAL = 30
+# seconds before a device whose channel SmartRent closed is joined again
+REJOIN_DELAY = 10
+# a connection that stays up this long resets the backoff
+STABLE_SECONDS = 60
+MIN_BACKOFF_SECONDS = 1.0
+MAX_BACKOFF_SECONDS = 300.0
+# failed connects in a row after which the hub polls until push is back
+FALLBACK_FAILURES = 5
+
+# devices are joined in waves of this size, this many seconds apart
+DEFAULT_WAVE_SIZE = 20
+DEFAULT_WAVE_DELAY = 0.5
+DEFAULT_JOIN_ORDER: tuple[type[SmartRentDevice], ...] = (
+    DoorLock,
+    Thermostat,
+    BinarySwitch,
+    MultilevelSwitch,
+    Sensor,
+)
+# the entry is ready once these are subscribed
+DEFAULT_CRITICAL: tuple[type[SmartRentDevice], ...] = (DoorLock,)
+
+HEARTBEAT_PAYLOAD = '[null, "{ref}", "phoenix", "heartbeat", {{}}]'
+LEAVE_PAYLOAD = '["null", "null", "devices:{device_id}", "phx_leave", {{}}]'
+
+
+# smartrent-py has no public api for what the connection needs, every use of
+# its private members goes through these two
+
+
+async def _async_websocket_uri(client: Client) -> str:
+    """Return the websocket uri, with an access token that is still valid."""
+    await client._async_refresh_token()
+    return SMARTRENT_WEBSOCKET_URI.format(client._token)
+
+
+async def _async_apply_event(device: SmartRentDevice, payload: dict[str, Any]) -> None:
+    """Update device from a pushed event and call its update callbacks."""
+    await device._update(payload)
+
+
+def _is_unauthorized(payload: dict[str, Any]) -> bool:
+    """Return True if a phx_reply or phx_error rejected the access token."""
+    response = payload.get("response")
+    reason = (response if isinstance(response, dict) else payload).get("reason")
+    return isinstance(reason, str) and "unauthoriz" in reason.lower()
+
+
+class PushConnection:
+    """Keeps one websocket to SmartRent open for all devices of an account.
+
+    This replaces the updater of smartrent-py, which reconnects without
+    telling anyone and fetches every device on its own afterwards. Phoenix
+    heartbeats detect a stalled stream, reconnects back off exponentially
+    with jitter and every reconnect is followed by one bulk resync through
+    the hub. A device channel closed by SmartRent only makes that device
+    unavailable until it is joined again. After ``FALLBACK_FAILURES``
+    failed connects in a row the hub falls back to polling while reconnects
+    go on in the background.
+
+    Device topics are joined in waves ordered by device class, locks first,
+    so a large account does not flood SmartRent with joins on startup. The
+    hub learns about every acknowledged join, and ``ready`` is set once the
+    critical devices are subscribed.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        client: Client,
+        hub: "SmartRentHub",
+        wave_size: int = DEFAULT_WAVE_SIZE,
+        wave_delay: float = DEFAULT_WAVE_DELAY,
+        join_order: Sequence[type[SmartRentDevice]] = DEFAULT_JOIN_ORDER,
+        critical: Sequence[type[SmartRentDevice]] = DEFAULT_CRITICAL,
+    ) -> None:
+        self.hass = hass
+        self.client = client
+        self.hub = hub
+        self.wave_size = wave_size
+        self.wave_delay = wave_delay
+        self.join_order = tuple(join_order)
+        self.critical = tuple(critical)
+
+        self._task: Optional[asyncio.Task[None]] = None
+        self._ws: Optional[Any] = None
+        self._heartbeat_ref = 0
+        self._last_message = 0.0
+        self._started = 0.0
+        self._critical_pending: set[int] = set()
+        self._rejoins: dict[int, CALLBACK_TYPE] = {}
+
+        self.ready = asyncio.Event()
+        self.connects = 0
+        self.disconnects = 0
+        # device class -> seconds from startup until each device was subscribed
+        self.time_to_subscribed: dict[str, list[float]] = defaultdict(list)
+        self._subscribed_once: set[int] = set()
+
+    @callback
+    def async_start(self) -> None:
+        """Start the supervised connection in the background."""
+        self._started = time.monotonic()
+        self._critical_pending = {
+            device._device_id
+            for device in self.hub.devices
+            if isinstance(device, self.critical)
+        }
+        if not self._critical_pending:
+            self.ready.set()
+
+        self._task = self.hass.async_create_background_task(
+            self._async_run(), "smartrent push connection"
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Close the connection and stop reconnecting."""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        self._ws = None
+        self._async_cancel_rejoins()
+
+    @callback
+    def async_join(self, device: SmartRentDevice) -> None:
+        """Subscribe to the events of a device on the open connection.
+
+        Devices are joined on every (re)connect anyway, so while disconnected
+        there is nothing to do.
+        """
+        self._async_send(JOINER_PAYLOAD.format(device_id=device._device_id))
+
+    @callback
+    def async_leave(self, device: SmartRentDevice) -> None:
+        """Stop receiving the events of a device."""
+        self._async_critical_done(device._device_id)
+        self._async_send(LEAVE_PAYLOAD.format(device_id=device._device_id))
+
+    @callback
+    def _async_send(self, payload: str) -> None:
+        """Send payload on the open connection, if there is one."""
+        if (websocket := self._ws) is not None:
+            self.hass.async_create_task(websocket.send(payload))
+
+    def _join_rank(self, device: SmartRentDevice) -> int:
+        """Return the position of the class of device in the join order."""
+        for rank, device_class in enumerate(self.join_order):
+            if isinstance(device, device_class):
+                return rank
+        return len(self.join_order)
+
+    async def _async_run(self) -> None:
+        """Connect, and reconnect with jittered backoff whenever the stream ends."""
+        failures = 0
+        while True:
+            connected_at = time.monotonic()
+            try:
+                await self._async_connect()
+            except Exception as exc:  # pylint: disable=broad-except
+                _LOGGER.debug("SmartRent push connection failed: %r", exc)
+            finally:
+                self._ws = None
+                self._async_cancel_rejoins()
+                self.hub.async_set_disconnected()
+
+            if time.monotonic() - connected_at >= STABLE_SECONDS:
+                failures = 0
+
+            backoff = min(MAX_BACKOFF_SECONDS, MIN_BACKOFF_SECONDS * 2**failures)
+            delay = backoff * random.uniform(0.5, 1)
+            failures += 1
+            if failures >= FALLBACK_FAILURES and not self.hub.polling:
+                _LOGGER.warning(
+                    "SmartRent push connection failed %s times, polling instead",
+                    failures,
+                )
+                self.hub.async_start_polling()
+            _LOGGER.warning(
+                "SmartRent push connection lost, reconnecting in %.1fs", delay
+            )
+            await asyncio.sleep(delay)
+
+    async def _async_connect(self) -> None:
+        """Open the websocket, join all devices and read events until it ends."""
+        uri = await _async_websocket_uri(self.client)
+
+        # heartbeats below take the place of websocket pings
+        async with websockets.connect(
+            uri, ping_interval=None, close_timeout=5, max_queue=None
+        ) as websocket:
+            self._ws = websocket
+            self.connects += 1
+            _LOGGER.debug("SmartRent push connection %s established", self.connects)
+
+            self._last_message = time.monotonic()
+            tasks = [
+                self.hass.async_create_background_task(
+                    self._async_join_devices(websocket, self.connects > 1),
+                    "smartrent push join",
+                ),
+                self.hass.async_create_background_task(
+                    self._async_heartbeat(websocket), "smartrent push heartbeat"
+                ),
+            ]
+            try:
+                async for message in websocket:
+                    self._last_message = time.monotonic()
+                    if not await self._async_handle_message(message):
+                        break
+            finally:
+                for task in tasks:
+                    task.cancel()
+                self.disconnects += 1
+
+    async def _async_join_devices(self, websocket: Any, resync: bool) -> None:
+        """Join every tracked device in waves, then resync if asked to."""
+        devices = sorted(self.hub.devices, key=self._join_rank)
+        for start in range(0, len(devices), self.wave_size):
+            if start:
+                await asyncio.sleep(self.wave_delay)
+            await asyncio.gather(
+                *[
+                    websocket.send(JOINER_PAYLOAD.format(device_id=device._device_id))
+                    for device in devices[start : start + self.wave_size]
+                ]
+            )
+
+        if self.hub.polling:
+            _LOGGER.info("SmartRent push connection restored, polling stopped")
+            self.hub.async_stop_polling()
+
+        if not resync:
+            return
+
+        # events may have been missed while disconnected
+        try:
+            await self.hub.async_resync()
+        except Exception as exc:  # pylint: disable=broad-except
+            _LOGGER.warning("Resync after reconnecting failed: %r", exc)
+
+    async def _async_heartbeat(self, websocket: Any) -> None:
+        """Close websocket once a heartbeat went unanswered for an interval."""
+        while True:
+            self._heartbeat_ref += 1
+            sent_at = time.monotonic()
+            await websocket.send(HEARTBEAT_PAYLOAD.format(ref=self._heartbeat_ref))
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+
+            if self._last_message < sent_at:
+                _LOGGER.warning("SmartRent push connection stalled, reconnecting")
+                await websocket.close()
+                return
+
+    async def _async_handle_message(self, message: Union[str, bytes]) -> bool:
+        """Forward a device event to its device.
+
+        Returns False when SmartRent asks us to reconnect.
+        """
+        _, _, topic, event, payload = json.loads(message)
+
+        if event in ("phx_reply", "phx_error") and _is_unauthorized(payload):
+            # the token is refreshed on the next connect
+            _LOGGER.debug("SmartRent rejected channel %s: %s", topic, payload)
+            return False
+
+        if not topic.startswith("devices:"):
+            # heartbeat replies, or errors of the socket itself
+            if event in ("phx_error", "phx_close"):
+                _LOGGER.debug("SmartRent closed channel %s: %s", topic, payload)
+                return False
+            return True
+
+        device_id = int(topic.split(":")[-1])
+        if event in ("phx_error", "phx_close"):
+            self._async_channel_closed(device_id)
+        elif event == "phx_reply":
+            if payload.get("status") == "ok":
+                self._async_subscribed(device_id)
+        elif payload.get("type") and (device := self.hub.get_device(device_id)):
+            self.hub.async_event_received(device_id, payload)
+            metrics = self.hub.metrics
+            if not metrics.enabled:
+                await _async_apply_event(device, payload)
+            else:
+                received = time.perf_counter()
+                # entities are written by the time the update callbacks return
+                await _async_apply_event(device, payload)
+                metrics.record_event(device, time.perf_counter() - received)
+
+        return True
+
+    @callback
+    def _async_subscribed(self, device_id: int) -> None:
+        """Handle SmartRent acknowledging the join of a device."""
+        if (device := self.hub.get_device(device_id)) is None:
+            return
+
+        if device_id not in self._subscribed_once:
+            self._subscribed_once.add(device_id)
+            self.time_to_subscribed[type(device).__name__].append(
+                time.monotonic() - self._started
+            )
+
+        self._async_critical_done(device_id)
+        self.hub.async_set_subscribed(device_id)
+
+    @callback
+    def _async_channel_closed(self, device_id: int) -> None:
+        """Mark a device unsubscribed and join it again after a while.
+
+        Devices that were left on purpose are not tracked anymore and stay
+        left.
+        """
+        self.hub.async_set_unsubscribed(device_id)
+        if self.hub.get_device(device_id) is None or device_id in self._rejoins:
+            return
+
+        _LOGGER.debug("SmartRent closed the channel of device %s", device_id)
+        self._rejoins[device_id] = async_call_later(
+            self.hass, REJOIN_DELAY, partial(self._async_rejoin, device_id)
+        )
+
+    @callback
+    def _async_rejoin(self, device_id: int, _now=None) -> None:
+        self._rejoins.pop(device_id, None)
+        if self.hub.get_device(device_id) is not None:
+            self._async_send(JOINER_PAYLOAD.format(device_id=device_id))
+
+    @callback
+    def _async_cancel_rejoins(self) -> None:
+        for unsub in self._rejoins.values():
+            unsub()
+        self._rejoins.clear()
+
+    @callback
+    def _async_critical_done(self, device_id: int) -> None:
+        """Set ready once the last critical device is subscribed or gone."""
+        if device_id not in self._critical_pending:
+            return
+
+        self._critical_pending.discard(device_id)
+        if not self._critical_pending:
+            _LOGGER.debug(
+                "Critical devices subscribed after %.2fs",
+                time.monotonic() - self._started,
+            )
+            self.ready.set()
@@ -7,3 +7,22 @@ CONF_USERNAME = "username"
 CONF_TOKEN = "token"
 PLATFORMS = ["binary_sensor", "climate", "light", "lock", "sensor", "switch"]
 STARTUP_MESSAGE = f"Starting setup for {DOMAIN}"
+
+# dispatched with a DeviceInventory of devices found after setup
+SIGNAL_DEVICES_ADDED = f"{DOMAIN}_devices_added_{{}}"
+
+CONF_DISCOVERY_INTERVAL = "discovery_interval"
+# minutes between two device list fetches, 0 turns discovery off
+DEFAULT_DISCOVERY_INTERVAL = 60
+
+CONF_COLLECT_METRICS = "collect_metrics"
+CONF_PERSIST_LOCK_ACTIVITY = "persist_lock_activity"
+
+CONF_UPDATE_MODE = "update_mode"
+UPDATE_MODE_PUSH = "push"
+# for networks where the push websocket is blocked
+UPDATE_MODE_POLL = "poll"
+
+# hass.data key of the running profiler
+PROFILER_KEY = f"{DOMAIN}_profiler"
+DEFAULT_SAMPLE_EVERY = 10
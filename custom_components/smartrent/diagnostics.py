@@ -0,0 +1,58 @@
+"""Diagnostics support for SmartRent."""
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_PASSWORD, CONF_TOKEN, CONF_USERNAME, DOMAIN
+from .models import SmartRentData
+from .session import session_stats
+
+TO_REDACT = {CONF_PASSWORD, CONF_TOKEN, CONF_USERNAME, "title", "unique_id"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    data: SmartRentData = hass.data[DOMAIN][entry.entry_id]
+    hub = data.hub
+    connection = hub.connection
+    # only created once polling started
+    poller = hub.poller
+    interval = poller.update_interval if poller else None
+
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "devices": {
+            device._device_id: {
+                "class": type(device).__name__,
+                "subscribed": hub.is_subscribed(device._device_id),
+                "available": hub.is_available(device._device_id),
+            }
+            for device in hub.devices
+        },
+        "hub": {
+            "dispatched_writes": hub.dispatched_writes,
+            "suppressed_writes": hub.suppressed_writes,
+        },
+        "updates": {
+            "configured_mode": data.update_mode,
+            "polling": hub.polling,
+            "poll_interval": interval.total_seconds() if interval else None,
+            "last_poll_success": poller and poller.last_update_success,
+            # device data fetches per update mode
+            "requests": hub.requests,
+        },
+        # None when polling was configured
+        "connection": connection
+        and {
+            "connects": connection.connects,
+            "disconnects": connection.disconnects,
+            "time_to_subscribed": connection.time_to_subscribed,
+        },
+        "scheduler": data.scheduler.stats,
+        "session": session_stats(data.session),
+        "metrics": hub.metrics.as_dict(),
+    }
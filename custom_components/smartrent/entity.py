@@ -0,0 +1,119 @@
+"""Base entity for the SmartRent integration."""
+import time
+from functools import partial
+from typing import Any, Awaitable, Callable, Sequence
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity import Entity
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import DOMAIN, SIGNAL_DEVICES_ADDED
+from .hub import SmartRentHub
+from .inventory import DeviceInventory, SmartRentDevice
+from .models import SmartRentData
+from .scheduler import PRIORITY_SWITCH
+
+
+@callback
+def async_add_device_entities(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+    build_entities: Callable[[SmartRentHub, DeviceInventory], Sequence[Entity]],
+) -> None:
+    """Add a platform's entities now and for every device found later on."""
+    data: SmartRentData = hass.data[DOMAIN][entry.entry_id]
+
+    @callback
+    def async_add_devices(inventory: DeviceInventory) -> None:
+        if entities := build_entities(data.hub, inventory):
+            async_add_entities(entities)
+
+    async_add_devices(data.hub.inventory)
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_DEVICES_ADDED.format(entry.entry_id), async_add_devices
+        )
+    )
+
+
+class SmartRentEntity(Entity):
+    """Entity that receives push updates for its device through the hub.
+
+    Subclasses list the device fields (``get_<field>`` getters) their state is
+    built from in ``device_fields``; the entity is only written when one of
+    them changes.
+
+    Entities only hold references to the hub and the device. Identity is
+    read from the device and the device info the hub shares per device, so
+    large fleets do not pay for a copy of them in every entity.
+    """
+
+    device_fields: tuple[str, ...] = ()
+    # queue position of this entity's commands in the CommandScheduler
+    command_priority: int = PRIORITY_SWITCH
+
+    def __init__(self, hub: SmartRentHub, device: SmartRentDevice) -> None:
+        super().__init__()
+        self.hub = hub
+        self.device = device
+
+    @property
+    def unique_id(self):
+        """Return the id of the device."""
+        return self.device._device_id
+
+    @property
+    def name(self):
+        """Return the name of the device."""
+        return self.device._name
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Return the device info shared by the entities of the device."""
+        return self.hub.device_info(self.device)
+
+    async def async_send_command(
+        self, command: Callable[..., Awaitable[Any]], *args: Any
+    ) -> Any:
+        """Send a device command through the account's command scheduler."""
+        scheduled = self.hub.scheduler.async_submit(
+            self.command_priority, partial(command, *args)
+        )
+        metrics = self.hub.metrics
+        start = time.perf_counter() if metrics.enabled else 0.0
+        error = True
+        try:
+            result = await scheduled
+            error = False
+            return result
+        finally:
+            if metrics.enabled:
+                metrics.record_command(self.device, time.perf_counter() - start, error)
+            self.hub.async_command_sent()
+
+    @property
+    def available(self) -> bool:
+        """Return False while the device is neither subscribed nor polled."""
+        return self.hub.is_available(self.device._device_id)
+
+    @property
+    def should_poll(self):
+        """Return the polling state, if needed."""
+        return False
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to device updates."""
+        self.async_on_remove(
+            self.hub.async_add_listener(
+                self.device._device_id, self.device_fields, self._async_device_updated
+            )
+        )
+
+    @callback
+    def _async_device_updated(self) -> None:
+        """Handle a change of one of the device fields."""
+        self.async_write_ha_state()
@@ -0,0 +1,465 @@
+"""Shared update hub for SmartRent devices."""
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from functools import partial
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Optional
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
+from homeassistant.helpers.event import async_track_time_interval
+from smartrent.api import API
+
+from .const import (
+    CONFIGURATION_URL,
+    PROPER_NAME,
+    UPDATE_MODE_POLL,
+    UPDATE_MODE_PUSH,
+)
+from .inventory import (
+    DeviceInventory,
+    SmartRentDevice,
+    apply_device_data,
+    create_device,
+)
+from .metrics import Metrics
+from .scheduler import CommandScheduler
+
+if TYPE_CHECKING:
+    from .connection import PushConnection
+    from .poller import SmartRentPoller
+    from .profiler import Profiler
+
+_LOGGER = logging.getLogger(__name__)
+
+# online and battery state are not pushed, so they are fetched this often
+RESYNC_INTERVAL = timedelta(minutes=10)
+
+# (fields the listener depends on, callback)
+_Listener = tuple[frozenset[str], Callable[[], None]]
+
+
+def read_field(device: SmartRentDevice, field: str) -> Any:
+    """Return the value of a device field through its ``get_<field>`` getter."""
+    return getattr(device, f"get_{field}")()
+
+
+class SmartRentHub:
+    """Owns the push connection for a config entry and fans out its events.
+
+    Each device is joined to the connection once and gets a single update
+    callback. Entities subscribe to the hub instead of to the device directly,
+    naming the device fields they depend on. On every device event the hub
+    compares those fields against the last seen values and only wakes the
+    entities whose fields changed.
+
+    Where push updates are unavailable the same hub is fed by the poller,
+    either because polling was configured or because the connection kept
+    failing. Polling stops again once the connection is back.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, api: API, scheduler: CommandScheduler
+    ) -> None:
+        self.hass = hass
+        self.api = api
+        self.scheduler = scheduler
+        self._devices: dict[int, SmartRentDevice] = {}
+        self._update_callbacks: dict[int, Callable[[], None]] = {}
+        self._device_infos: dict[int, DeviceInfo] = {}
+        self._inventory: Optional[DeviceInventory] = None
+        self._refresh_lock = asyncio.Lock()
+        self._listeners: dict[int, list[_Listener]] = defaultdict(list)
+        self._snapshots: dict[int, dict[str, Any]] = defaultdict(dict)
+        # called with every pushed event of a device, even if nothing changed
+        self._event_listeners: dict[int, list[Callable[[dict[str, Any]], None]]] = {}
+        self._unsub_resync: Optional[CALLBACK_TYPE] = None
+
+        # created once push starts, polled entries never connect
+        self.connection: Optional["PushConnection"] = None
+        self._subscribed: set[int] = set()
+        self.metrics = Metrics()
+        self.profiler: Optional["Profiler"] = None
+
+        # created once polling starts, most entries never poll
+        self.poller: Optional["SmartRentPoller"] = None
+        self.polling = False
+        self._polling_started = asyncio.Event()
+        self._poll_ok = False
+        self._unsub_poller: Optional[CALLBACK_TYPE] = None
+        # device data fetches per update mode
+        self.requests = {UPDATE_MODE_PUSH: 0, UPDATE_MODE_POLL: 0}
+
+        self.dispatched_writes = 0
+        self.suppressed_writes = 0
+
+    @callback
+    def async_start(self, push: bool = True) -> None:
+        """Track every device known to the api and connect or poll for updates."""
+        for device in self.api.get_device_list():
+            self._async_track_device(device)
+
+        if not push:
+            self.async_start_polling()
+            _LOGGER.debug("Polling %s devices", len(self._devices))
+            return
+
+        # pylint: disable-next=import-outside-toplevel
+        from .connection import PushConnection
+
+        self.connection = PushConnection(self.hass, self.api.client, self)
+        self.connection.async_start()
+        self._unsub_resync = async_track_time_interval(
+            self.hass, self._async_periodic_resync, RESYNC_INTERVAL
+        )
+        _LOGGER.debug("Tracking %s devices", len(self._devices))
+
+    @callback
+    def _async_track_device(self, device: SmartRentDevice) -> None:
+        """Subscribe to the updates of a device if it is not tracked already."""
+        if device._device_id in self._devices:
+            return
+
+        update_callback = partial(self._async_dispatch, device._device_id)
+        self._devices[device._device_id] = device
+        self._inventory = None
+        self._update_callbacks[device._device_id] = update_callback
+        device.set_update_callback(update_callback)
+        if self.connection:
+            self.connection.async_join(device)
+
+    @callback
+    def _async_untrack_device(self, device_id: int) -> None:
+        """Unsubscribe from the updates of a device and forget about it."""
+        device = self._devices.pop(device_id)
+        self._inventory = None
+        device.unset_update_callback(self._update_callbacks.pop(device_id))
+        if self.connection:
+            self.connection.async_leave(device)
+        self._subscribed.discard(device_id)
+        self._device_infos.pop(device_id, None)
+
+    def device_info(self, device: SmartRentDevice) -> DeviceInfo:
+        """Return the device info shared by all entities of a device."""
+        if (device_info := self._device_infos.get(device._device_id)) is None:
+            device_info = self._device_infos[device._device_id] = DeviceInfo(
+                identifiers={("id", device._device_id)},
+                name=str(device._name),
+                manufacturer=PROPER_NAME,
+                model=str(device.__class__.__name__),
+                entry_type=DeviceEntryType.SERVICE,
+                configuration_url=CONFIGURATION_URL,
+            )
+
+        return device_info
+
+    def get_device(self, device_id: int) -> Optional[SmartRentDevice]:
+        """Return a tracked device by id."""
+        return self._devices.get(device_id)
+
+    @property
+    def devices(self) -> list[SmartRentDevice]:
+        """Return every device tracked by the hub."""
+        return list(self._devices.values())
+
+    @property
+    def inventory(self) -> DeviceInventory:
+        """Return the tracked devices grouped by class.
+
+        It is built once and shared by all platforms until devices are added
+        or removed.
+        """
+        if self._inventory is None:
+            self._inventory = DeviceInventory(self._devices.values())
+        return self._inventory
+
+    async def async_refresh_devices(
+        self,
+    ) -> tuple[list[SmartRentDevice], list[int]]:
+        """Fetch the device list and track the devices that came or went.
+
+        Devices that are already known keep their objects and subscriptions.
+        Returns the newly added devices and the ids of the removed ones.
+        """
+        async with self._refresh_lock:
+            devices_data = await self.api.client.async_get_devices_data()
+            return self._async_apply_devices_data(devices_data)
+
+    @callback
+    def _async_apply_devices_data(
+        self, devices_data: list[dict[str, Any]]
+    ) -> tuple[list[SmartRentDevice], list[int]]:
+        """Diff fetched device data against the tracked devices by id."""
+        seen: set[int] = set()
+        added: list[SmartRentDevice] = []
+        for data in devices_data:
+            device_id = int(data["id"])
+            seen.add(device_id)
+            if device_id in self._devices:
+                continue
+
+            if device := create_device(self.api.client, data):
+                added.append(device)
+
+        removed = [device_id for device_id in self._devices if device_id not in seen]
+        for device_id in removed:
+            self._async_untrack_device(device_id)
+        for device in added:
+            self._async_track_device(device)
+
+        if added or removed:
+            # keep the getters of the api in line with what the hub tracks
+            self.api._device_list[:] = self.devices
+            _LOGGER.debug("Devices added: %s, removed: %s", len(added), removed)
+
+        return added, removed
+
+    async def async_resync(self, mode: str = UPDATE_MODE_PUSH) -> int:
+        """Update every tracked device from a single fetch of the device list.
+
+        The fetch is counted for mode. Returns how many devices changed.
+        """
+        async with self._refresh_lock:
+            self.requests[mode] += 1
+            devices_data = await self.api.client.async_get_devices_data()
+
+        changed = 0
+        for data in devices_data:
+            if device := self._devices.get(int(data["id"])):
+                apply_device_data(device, data)
+                changed += self._async_dispatch(device._device_id)
+        return changed
+
+    async def _async_periodic_resync(self, _now=None) -> None:
+        if self.polling:
+            # the poller fetches everything more often anyway
+            return
+        try:
+            await self.async_resync()
+        except Exception as exc:  # pylint: disable=broad-except
+            _LOGGER.warning("Fetching SmartRent device state failed: %r", exc)
+
+    async def async_wait_ready(self, timeout: float) -> bool:
+        """Wait up to timeout seconds for the critical devices to be subscribed.
+
+        The other devices keep being subscribed in the background. Polling
+        counts as ready, as it starts from the state fetched at setup.
+        """
+        waiters = [asyncio.ensure_future(self._polling_started.wait())]
+        if self.connection:
+            waiters.append(asyncio.ensure_future(self.connection.ready.wait()))
+        done, pending = await asyncio.wait(
+            waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+        )
+        for waiter in pending:
+            waiter.cancel()
+        return bool(done)
+
+    def is_subscribed(self, device_id: int) -> bool:
+        """Return True if push updates of the device are being received."""
+        return device_id in self._subscribed
+
+    def is_available(self, device_id: int) -> bool:
+        """Return True if the device is subscribed or polled successfully."""
+        return device_id in self._subscribed or (self.polling and self._poll_ok)
+
+    @callback
+    def async_start_polling(self) -> None:
+        """Keep devices up to date through the poller."""
+        if self.polling:
+            return
+
+        if self.poller is None:
+            # pylint: disable-next=import-outside-toplevel
+            from .poller import SmartRentPoller
+
+            self.poller = SmartRentPoller(self.hass, self)
+
+        _LOGGER.info("Polling SmartRent for device state")
+        self.polling = True
+        self._poll_ok = True
+        self._polling_started.set()
+        # the coordinator schedules its updates while it has a listener
+        self._unsub_poller = self.poller.async_add_listener(self._async_poll_updated)
+        self.hass.async_create_task(self.poller.async_refresh())
+        self._async_dispatch_all()
+
+    @callback
+    def async_stop_polling(self) -> None:
+        """Stop polling, push updates arrive again."""
+        if not self.polling:
+            return
+
+        self.polling = False
+        self._polling_started.clear()
+        if self._unsub_poller:
+            self._unsub_poller()
+            self._unsub_poller = None
+        self._async_dispatch_all()
+
+    @callback
+    def _async_poll_updated(self) -> None:
+        """Refresh all entities when polling starts or stops failing."""
+        if self.poller and self.poller.last_update_success != self._poll_ok:
+            self._poll_ok = self.poller.last_update_success
+            self._async_dispatch_all()
+
+    @callback
+    def async_command_sent(self) -> None:
+        """Poll sooner, so the result of a command shows up quickly."""
+        if self.polling and self.poller:
+            self.poller.async_boost()
+
+    @callback
+    def _async_dispatch_all(self) -> None:
+        """Update every entity, for example after availability changed."""
+        for device_id in list(self._listeners):
+            self._async_dispatch(device_id, force=True)
+
+    @callback
+    def async_set_subscribed(self, device_id: int) -> None:
+        """Record that a device was subscribed and refresh its entities."""
+        if device_id in self._subscribed or device_id not in self._devices:
+            return
+
+        self._subscribed.add(device_id)
+        if device_id in self._listeners:
+            self._async_dispatch(device_id, force=True)
+
+    @callback
+    def async_set_unsubscribed(self, device_id: int) -> None:
+        """Record that the channel of a device closed and refresh its entities."""
+        if device_id not in self._subscribed:
+            return
+
+        self._subscribed.discard(device_id)
+        if device_id in self._listeners:
+            self._async_dispatch(device_id, force=True)
+
+    @callback
+    def async_set_disconnected(self) -> None:
+        """Record that the push connection dropped and refresh all entities."""
+        subscribed, self._subscribed = self._subscribed, set()
+        for device_id in subscribed:
+            if device_id in self._listeners:
+                self._async_dispatch(device_id, force=True)
+
+    @callback
+    def async_add_listener(
+        self,
+        device_id: int,
+        fields: Iterable[str],
+        update_callback: Callable[[], None],
+    ) -> Callable[[], None]:
+        """Call update_callback when one of the given device fields changes.
+
+        A listener without fields is called on every device update.
+        Returns a function that removes the listener again.
+        """
+        listener: _Listener = (frozenset(fields), update_callback)
+        listeners = self._listeners[device_id]
+        listeners.append(listener)
+
+        # record current values so the first event is diffed against them
+        snapshot = self._snapshots[device_id]
+        if device := self._devices.get(device_id):
+            for field in listener[0].difference(snapshot):
+                snapshot[field] = read_field(device, field)
+
+        @callback
+        def remove_listener() -> None:
+            listeners.remove(listener)
+            if not listeners:
+                self._listeners.pop(device_id, None)
+                self._snapshots.pop(device_id, None)
+
+        return remove_listener
+
+    @callback
+    def async_add_event_listener(
+        self, device_id: int, event_callback: Callable[[dict[str, Any]], None]
+    ) -> Callable[[], None]:
+        """Call event_callback with every event pushed for a device.
+
+        It is called before the event is applied to the device. Returns a
+        function that removes the listener again.
+        """
+        listeners = self._event_listeners.setdefault(device_id, [])
+        listeners.append(event_callback)
+
+        @callback
+        def remove_listener() -> None:
+            listeners.remove(event_callback)
+            if not listeners:
+                self._event_listeners.pop(device_id, None)
+
+        return remove_listener
+
+    @callback
+    def async_event_received(self, device_id: int, event: dict[str, Any]) -> None:
+        """Pass a pushed event to the event listeners of its device."""
+        for event_callback in self._event_listeners.get(device_id, ()):
+            event_callback(event)
+
+    @callback
+    def _async_dispatch(self, device_id: int, force: bool = False) -> bool:
+        """Forward a device update to the entities whose fields changed.
+
+        With force every entity of the device is updated. Returns True if a
+        field that entities depend on changed.
+        """
+        if not (listeners := self._listeners.get(device_id)) or not (
+            device := self._devices.get(device_id)
+        ):
+            # entities of untracked devices are still being removed
+            return False
+
+        snapshot = self._snapshots[device_id]
+
+        changed = set()
+        for field in frozenset().union(*(fields for fields, _ in listeners)):
+            value = read_field(device, field)
+            if field not in snapshot or snapshot[field] != value:
+                snapshot[field] = value
+                changed.add(field)
+
+        # copy so listeners can unsubscribe while being called
+        for fields, update_callback in list(listeners):
+            if fields and not force and fields.isdisjoint(changed):
+                self.suppressed_writes += 1
+                continue
+
+            self.dispatched_writes += 1
+            if self.profiler:
+                self.profiler.call(update_callback)
+            else:
+                update_callback()
+
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            # runs for every event, skip sorting unless it is logged
+            _LOGGER.debug(
+                "Device %s changed %s; %s writes suppressed so far",
+                device_id,
+                sorted(changed),
+                self.suppressed_writes,
+            )
+        return bool(changed)
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Disconnect, stop polling and drop all subscriptions."""
+        if self.connection:
+            self.connection.async_stop()
+        self.async_stop_polling()
+        if self.poller:
+            self.hass.async_create_task(self.poller.async_shutdown())
+        if self._unsub_resync:
+            self._unsub_resync()
+            self._unsub_resync = None
+
+        for device_id in list(self._devices):
+            self._async_untrack_device(device_id)
+
+        self._listeners.clear()
+        self._snapshots.clear()
@@ -0,0 +1,111 @@
+"""Device inventory helpers for the SmartRent integration."""
+from typing import Any, Iterable, Optional, Union
+
+from smartrent import (
+    BinarySwitch,
+    Client,
+    DoorLock,
+    LeakSensor,
+    MotionSensor,
+    MultilevelSwitch,
+    Sensor,
+    Thermostat,
+)
+
+SmartRentDevice = Union[BinarySwitch, DoorLock, MultilevelSwitch, Sensor, Thermostat]
+
+# device "type" reported by SmartRent -> class, as in smartrent.api.API
+_DEVICE_TYPES: dict[str, type[SmartRentDevice]] = {
+    "thermostat": Thermostat,
+    "entry_control": DoorLock,
+    "switch_binary": BinarySwitch,
+    "switch_multilevel": MultilevelSwitch,
+}
+_SENSOR_TYPES: dict[str, type[Sensor]] = {
+    "leak": LeakSensor,
+    "motion_binary": MotionSensor,
+}
+# classes the inventory groups devices by
+_GROUPS: tuple[type[SmartRentDevice], ...] = (
+    DoorLock,
+    Thermostat,
+    BinarySwitch,
+    MultilevelSwitch,
+    LeakSensor,
+    MotionSensor,
+)
+
+
+def create_device(client: Client, data: dict[str, Any]) -> Optional[SmartRentDevice]:
+    """Build a device from an entry of ``Client.async_get_devices_data``.
+
+    Returns None for device types the integration does not support.
+    """
+    device_type = str(data.get("type"))
+    device: Optional[SmartRentDevice] = None
+
+    if device_class := _DEVICE_TYPES.get(device_type):
+        device = device_class(data["id"], client)
+
+    elif device_type == "sensor_notification":
+        for attr in data.get("attributes", []):
+            if sensor_class := _SENSOR_TYPES.get(attr.get("name")):
+                device = sensor_class(data["id"], client)
+
+    if device:
+        apply_device_data(device, data)
+
+    return device
+
+
+def apply_device_data(device: SmartRentDevice, data: dict[str, Any]) -> None:
+    """Update a device from its api data, like ``Device._async_fetch_state``."""
+    device._battery_level = data.get("battery_level")
+    device._battery_powered = data.get("battery_powered")
+    device._online = data.get("online")
+
+    device._fetch_state_helper(data)
+
+
+class DeviceInventory:
+    """A set of devices with the typed getters of ``smartrent.api.API``.
+
+    Devices are grouped by class and indexed by id once, when the inventory
+    is built, so the getters do not walk the device list again.
+    """
+
+    def __init__(self, devices: Iterable[SmartRentDevice]) -> None:
+        self._devices = list(devices)
+        self._by_id = {device._device_id: device for device in self._devices}
+        self._by_class: dict[type[SmartRentDevice], list[Any]] = {
+            device_class: [] for device_class in _GROUPS
+        }
+        for device in self._devices:
+            for device_class in type(device).__mro__:
+                if (group := self._by_class.get(device_class)) is not None:
+                    group.append(device)
+                    break
+
+    def get(self, device_id: int) -> Optional[SmartRentDevice]:
+        return self._by_id.get(device_id)
+
+    def get_device_list(self) -> list[SmartRentDevice]:
+        return self._devices
+
+    def get_locks(self) -> list[DoorLock]:
+        return self._by_class[DoorLock]
+
+    def get_thermostats(self) -> list[Thermostat]:
+        return self._by_class[Thermostat]
+
+    def get_binary_switches(self) -> list[BinarySwitch]:
+        return self._by_class[BinarySwitch]
+
+    def get_multilevel_switches(self) -> list[MultilevelSwitch]:
+        return self._by_class[MultilevelSwitch]
+
+    def get_leak_sensors(self) -> list[LeakSensor]:
+        return self._by_class[LeakSensor]
+
+    def get_motion_sensors(self) -> list[MotionSensor]:
+        return self._by_class[MotionSensor]
@@ -7,50 +7,69 @@ from homeassistant.components.light import (
     COLOR_MODE_BRIGHTNESS,
     LightEntity,
 )
-from homeassistant.helpers.device_registry import DeviceEntryType
+from homeassistant.core import CALLBACK_TYPE, callback
+from homeassistant.helpers.event import async_call_later
 from smartrent import MultilevelSwitch
 
-from .const import CONFIGURATION_URL, DOMAIN, PROPER_NAME
+from .commands import CommandQueue
+from .entity import SmartRentEntity, async_add_device_entities
+from .hub import SmartRentHub
+from .inventory import DeviceInventory
+from .scheduler import PRIORITY_LIGHT
 
 _LOGGER = logging.getLogger(__name__)
 
+# seconds to wait for more level changes before sending the latest one
+COMMAND_DELAY = 0.3
+# seconds to wait for the device to report a sent level before rolling back
+CONFIRM_TIMEOUT = 10
+
 
 async def async_setup_entry(hass, entry, async_add_entities):
     """Setup climate platform."""
-    client = hass.data[DOMAIN][entry.entry_id]
-    ml_switches = client.get_multilevel_switches()
-    for ml_switch in ml_switches:
-        async_add_entities([SmartrentLight(ml_switch)])
+    async_add_device_entities(hass, entry, async_add_entities, _build_lights)
 
 
-class SmartrentLight(LightEntity):
-    def __init__(self, ml_switch: MultilevelSwitch) -> None:
-        super().__init__()
+def _build_lights(
+    hub: SmartRentHub, inventory: DeviceInventory
+) -> list["SmartrentLight"]:
+    """Create the lights for the devices in inventory."""
+    return [
+        SmartrentLight(hub, ml_switch)
+        for ml_switch in inventory.get_multilevel_switches()
+    ]
 
-        self.device = ml_switch
 
-        # Cache the level from smartrent.
-        # Useful when light is turned on & we want to set it to the previous level
-        # it was at when on last.
-        self._prev_level_in_ha: int = self.device.get_level() or 50
+class SmartrentLight(SmartRentEntity, LightEntity):
+    device_fields = ("level",)
+    command_priority = PRIORITY_LIGHT
 
-        self.device.start_updater()
-        self.device.set_update_callback(self.async_schedule_update_ha_state)
+    def __init__(self, hub: SmartRentHub, ml_switch: MultilevelSwitch) -> None:
+        super().__init__(hub, ml_switch)
 
-    @property
-    def should_poll(self):
-        """Return the polling state, if needed."""
-        return False
+        # Last level the device reported on its own
+        self._confirmed_level: Optional[int] = self.device.get_level()
+        # Level we asked for and did not get confirmed yet
+        self._target_level: Optional[int] = None
+        # Level the light was at when on last.
+        # Useful when light is turned on & we want to set it to that level again
+        self._last_on_level: int = self._confirmed_level or 50
 
-    @property
-    def unique_id(self):
-        """Return a unique ID."""
-        return self.device._device_id
+        # created on the first command, most lights rarely get any
+        self._commands: Optional[CommandQueue] = None
+        self._unsub_confirm: Optional[CALLBACK_TYPE] = None
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Drop commands that were not sent yet."""
+        await super().async_will_remove_from_hass()
+        if self._commands:
+            self._commands.async_cancel()
+        self._async_cancel_confirm()
 
     @property
-    def name(self):
-        """Return the display name of this light."""
-        return self.device._name
+    def _level_pending(self) -> bool:
+        """Return True if a level is waiting to be sent."""
+        return self._commands is not None and self._commands.is_queued("level")
 
     @property
     def supported_color_modes(self) -> Optional[Set[str]]:
@@ -64,43 +83,114 @@ class SmartrentLight(LightEntity):
         """Return the active color mode."""
         return COLOR_MODE_BRIGHTNESS
 
+    @property
+    def _level(self) -> Optional[int]:
+        """Return the requested level until confirmed, else the reported level.
+
+        The library takes a sent level as the device level before the device
+        reports it, so the level is not read from the device.
+        """
+        if self._target_level is not None:
+            return self._target_level
+        return self._confirmed_level
+
     @property
     def is_on(self) -> bool:
         """Return true if light is on."""
-        return bool(self.device.get_level())
+        return bool(self._level)
 
     @property
-    def brightness(self) -> int:
+    def brightness(self) -> Optional[int]:
         """Return the brightness of this light between 0..255."""
-        brightness = self.device.get_level()
-
-        # store current level in case light turns off
-        # & we have a refrence how bright light used to be
-        self._prev_level_in_ha = brightness or self._prev_level_in_ha
+        if (level := self._level) is None:
+            return None
 
-        return round((brightness * 255.0) / 100.0)
+        return round((level * 255.0) / 100.0)
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the light on."""
         if (brightness := kwargs.get(ATTR_BRIGHTNESS)) is not None:
             brightness = round((brightness * 100.0) / 255.0)
 
-        brightness = brightness or self._prev_level_in_ha
-
-        self._prev_level_in_ha = brightness
-        await self.device.async_set_level(brightness)
+        await self._async_set_level(brightness or self._last_on_level)
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the light off."""
-        await self.device.async_set_level(0)
+        await self._async_set_level(0)
+
+    async def _async_set_level(self, level: int) -> None:
+        """Show level right away and send only the latest level of a burst."""
+        self._async_cancel_confirm()
+        self._target_level = level
+        if level:
+            self._last_on_level = level
+
+        if self._commands is None:
+            self._commands = CommandQueue(
+                self.hass,
+                COMMAND_DELAY,
+                {"level": self._async_send_level},
+                self._async_level_sent,
+            )
+
+        waiter = self._commands.async_set("level", level)
+        self.async_write_ha_state()
+        await waiter
+
+    async def _async_send_level(self, level: int) -> None:
+        """Send a level, going back to the reported level if that failed."""
+        try:
+            await self.async_send_command(self.device.async_set_level, level)
+        except Exception:
+            self._async_rollback()
+            raise
+
+    @callback
+    def _async_level_sent(self) -> None:
+        """Wait for the device to confirm the level that was sent."""
+        self._async_cancel_confirm()
+        if self._target_level is None:
+            # confirmed or rolled back already
+            return
+        self._unsub_confirm = async_call_later(
+            self.hass, CONFIRM_TIMEOUT, self._async_rollback
+        )
 
-    @property
-    def device_info(self):
-        return dict(
-            identifiers={("id", self.device._device_id)},
-            name=str(self.name),
-            manufacturer=PROPER_NAME,
-            model=str(self.device.__class__.__name__),
-            entry_type=DeviceEntryType.SERVICE,
-            configuration_url=CONFIGURATION_URL,
+    @callback
+    def _async_rollback(self, _now=None) -> None:
+        """Go back to the last confirmed level.
+
+        Runs when sending failed or the device never echoed the sent level. A
+        newer level waiting to be sent is kept.
+        """
+        self._unsub_confirm = None
+        if self._target_level is None or self._level_pending:
+            return
+
+        _LOGGER.debug(
+            "%s did not confirm level %s, rolling back to %s",
+            self.name,
+            self._target_level,
+            self._confirmed_level,
         )
+        self._target_level = None
+        self.async_write_ha_state()
+
+    @callback
+    def _async_cancel_confirm(self) -> None:
+        if self._unsub_confirm:
+            self._unsub_confirm()
+            self._unsub_confirm = None
+
+    @callback
+    def _async_device_updated(self) -> None:
+        """Take a level reported by the device as confirmed."""
+        self._confirmed_level = level = self.device.get_level()
+        if level:
+            self._last_on_level = level
+
+        if level == self._target_level and not self._level_pending:
+            self._async_cancel_confirm()
+            self._target_level = None
+
+        super()._async_device_updated()
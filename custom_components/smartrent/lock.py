@@ -3,50 +3,32 @@ import logging
 from typing import Any, Union
 
 from homeassistant.components.lock import LockEntity, LockEntityFeature
-from homeassistant.helpers.device_registry import DeviceEntryType
-from smartrent import DoorLock
 
-from .const import CONFIGURATION_URL, PROPER_NAME
+from .activity import parse_notification
+from .entity import SmartRentEntity, async_add_device_entities
+from .hub import SmartRentHub
+from .inventory import DeviceInventory
+from .scheduler import PRIORITY_LOCK
 
 _LOGGER = logging.getLogger(__name__)
 
 
 async def async_setup_entry(hass, entry, async_add_entities):
     """Setup lock platform."""
-    client = hass.data["smartrent"][entry.entry_id]
-    locks = client.get_locks()
-    for lock in locks:
-        async_add_entities([SmartrentLock(lock)])
+    async_add_device_entities(hass, entry, async_add_entities, _build_locks)
 
 
-class SmartrentLock(LockEntity):
-    def __init__(self, lock: DoorLock) -> None:
-        super().__init__()
-        self.device = lock
-        self._attr_supported_features = LockEntityFeature.OPEN
+def _build_locks(
+    hub: SmartRentHub, inventory: DeviceInventory
+) -> list["SmartrentLock"]:
+    """Create the locks for the devices in inventory."""
+    return [SmartrentLock(hub, lock) for lock in inventory.get_locks()]
 
-        self.device.start_updater()
-        self.device.set_update_callback(self.async_schedule_update_ha_state)
 
-    @property
-    def supported_features(self):
-        """Flag supported features."""
-        return LockEntityFeature.OPEN
-
-    @property
-    def should_poll(self):
-        """Return the polling state, if needed."""
-        return False
-
-    @property
-    def unique_id(self):
-        """Return a unique ID."""
-        return self.device._device_id
-
-    @property
-    def name(self):
-        """Return the display name of this lock."""
-        return self.device._name
+class SmartrentLock(SmartRentEntity, LockEntity):
+    device_fields = ("locked", "notification")
+    command_priority = PRIORITY_LOCK
+    _attr_supported_features = LockEntityFeature.OPEN
 
     @property
     def changed_by(self) -> Union[str, None]:
@@ -58,21 +40,10 @@ class SmartrentLock(LockEntity):
 
     @property
     def is_jammed(self) -> Union[bool, None]:
-        return "ALARM_TYPE_9" in str(self.device.get_notification())
+        return parse_notification(self.device.get_notification()).jammed
 
     async def async_lock(self, **kwargs: Any):
-        await self.device.async_set_locked(True)
+        await self.async_send_command(self.device.async_set_locked, True)
 
     async def async_unlock(self, **kwargs: Any):
-        await self.device.async_set_locked(False)
-
-    @property
-    def device_info(self):
-        return dict(
-            identifiers={("id", self.device._device_id)},
-            name=str(self.name),
-            manufacturer=PROPER_NAME,
-            model=str(self.device.__class__.__name__),
-            entry_type=DeviceEntryType.SERVICE,
-            configuration_url=CONFIGURATION_URL,
-        )
+        await self.async_send_command(self.device.async_set_locked, False)
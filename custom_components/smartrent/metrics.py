@@ -0,0 +1,112 @@
+"""Counters and latency histograms for SmartRent events and commands."""
+import bisect
+from collections import defaultdict
+from typing import Any, Optional
+
+from .inventory import SmartRentDevice
+
+# upper bounds in seconds, the last bucket takes everything above
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """Latencies counted into fixed buckets, plus their count, sum and max."""
+
+    __slots__ = ("buckets", "count", "total", "max")
+
+    def __init__(self) -> None:
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+    def as_dict(self) -> dict[str, Any]:
+        labels = [f"le_{bound}" for bound in LATENCY_BUCKETS] + ["inf"]
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "max": self.max,
+            "buckets": dict(zip(labels, self.buckets)),
+        }
+
+
+class DeviceMetrics:
+    """What happened to one device, or to all devices of a class."""
+
+    __slots__ = ("events", "event_latency", "commands", "command_latency", "errors")
+
+    def __init__(self) -> None:
+        self.events = 0
+        self.event_latency = Histogram()
+        self.commands = 0
+        self.command_latency = Histogram()
+        self.errors = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "events": self.events,
+            "event_latency": self.event_latency.as_dict(),
+            "commands": self.commands,
+            "command_latency": self.command_latency.as_dict(),
+            "errors": self.errors,
+        }
+
+
+class Metrics:
+    """Records events and commands per device and per device class.
+
+    Callers check ``enabled`` before taking timestamps, so while disabled
+    the cost is a single attribute read per event or command.
+    """
+
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self.devices: dict[int, DeviceMetrics] = defaultdict(DeviceMetrics)
+        self.device_classes: dict[str, DeviceMetrics] = defaultdict(DeviceMetrics)
+        self.total = DeviceMetrics()
+
+    def _targets(self, device: SmartRentDevice) -> tuple[DeviceMetrics, ...]:
+        return (
+            self.devices[device._device_id],
+            self.device_classes[type(device).__name__],
+            self.total,
+        )
+
+    def record_event(self, device: SmartRentDevice, latency: float) -> None:
+        """Record an event and the seconds it took until entities were written."""
+        for metrics in self._targets(device):
+            metrics.events += 1
+            metrics.event_latency.add(latency)
+
+    def record_command(
+        self, device: SmartRentDevice, latency: float, error: bool
+    ) -> None:
+        """Record a command and the seconds until SmartRent took it."""
+        for metrics in self._targets(device):
+            metrics.commands += 1
+            metrics.command_latency.add(latency)
+            if error:
+                metrics.errors += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "total": self.total.as_dict(),
+            "device_classes": {
+                name: metrics.as_dict() for name, metrics in self.device_classes.items()
+            },
+            "devices": {
+                device_id: metrics.as_dict()
+                for device_id, metrics in self.devices.items()
+            },
+        }
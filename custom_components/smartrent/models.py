@@ -0,0 +1,29 @@
+"""Runtime data stored for each SmartRent config entry."""
+from dataclasses import dataclass
+from typing import Optional
+
+from aiohttp import ClientSession
+from homeassistant.core import CALLBACK_TYPE
+from smartrent.api import API
+
+from .activity import LockActivityLog
+from .auth import TokenManager
+from .hub import SmartRentHub
+from .scheduler import CommandScheduler
+
+
+@dataclass
+class SmartRentData:
+    """Objects shared by the platforms of a config entry."""
+
+    api: API
+    session: ClientSession
+    hub: SmartRentHub
+    scheduler: CommandScheduler
+    tokens: TokenManager
+    activity: LockActivityLog
+    # username, password and tfa token the api logged in with
+    credentials: tuple[str, str, Optional[str]]
+    # the configured update mode, the hub may poll in push mode as a fallback
+    update_mode: str
+    cancel_discovery: Optional[CALLBACK_TYPE] = None
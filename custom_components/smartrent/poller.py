@@ -0,0 +1,72 @@
+"""Polling of SmartRent device state for when push updates are unavailable."""
+import asyncio
+import logging
+import time
+from datetime import timedelta
+from typing import TYPE_CHECKING
+
+from aiohttp import ClientError
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from smartrent.utils import InvalidAuthError
+
+from .const import DOMAIN, UPDATE_MODE_POLL
+
+if TYPE_CHECKING:
+    from .hub import SmartRentHub
+
+_LOGGER = logging.getLogger(__name__)
+
+# right after commands or while motion is detected
+MIN_INTERVAL = timedelta(seconds=10)
+DEFAULT_INTERVAL = timedelta(seconds=30)
+# reached by doubling the interval while nothing changes
+MAX_INTERVAL = timedelta(minutes=5)
+# seconds to keep polling at MIN_INTERVAL after a command
+ACTIVE_SECONDS = 60
+
+
+class SmartRentPoller(DataUpdateCoordinator[int]):
+    """Fetches the state of all devices with one request per interval.
+
+    State goes through the hub like push updates do, so the same entities
+    are updated. The interval drops to ``MIN_INTERVAL`` after commands and
+    while motion is detected, and doubles up to ``MAX_INTERVAL`` for every
+    poll that changed nothing.
+    """
+
+    def __init__(self, hass: HomeAssistant, hub: "SmartRentHub") -> None:
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"{DOMAIN} poller",
+            update_interval=DEFAULT_INTERVAL,
+        )
+        self.hub = hub
+        self._active_until = 0.0
+
+    async def _async_update_data(self) -> int:
+        """Update every device and pick the next interval."""
+        try:
+            changed = await self.hub.async_resync(UPDATE_MODE_POLL)
+        except (ClientError, asyncio.TimeoutError, InvalidAuthError, EOFError) as exc:
+            raise UpdateFailed(exc) from exc
+
+        motion = any(
+            sensor.get_active() for sensor in self.hub.inventory.get_motion_sensors()
+        )
+        if motion or time.monotonic() < self._active_until:
+            self.update_interval = MIN_INTERVAL
+        elif changed:
+            self.update_interval = DEFAULT_INTERVAL
+        else:
+            self.update_interval = min(MAX_INTERVAL, self.update_interval * 2)
+
+        return changed
+
+    @callback
+    def async_boost(self) -> None:
+        """Poll soon and often for a while, a command was just sent."""
+        self._active_until = time.monotonic() + ACTIVE_SECONDS
+        self.update_interval = MIN_INTERVAL
+        self.hass.async_create_task(self.async_request_refresh())
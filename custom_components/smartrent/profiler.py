@@ -0,0 +1,121 @@
+"""Sampling profiler for the properties and callbacks of SmartRent entities."""
+import functools
+import json
+import time
+from typing import Any, Callable
+
+from .const import DEFAULT_SAMPLE_EVERY
+
+
+class ProfileStat:
+    """Call count of one property or callback and the time of sampled calls."""
+
+    __slots__ = ("calls", "sampled", "seconds")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.sampled = 0
+        self.seconds = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        per_call = self.seconds / self.sampled if self.sampled else 0.0
+        return {
+            "calls": self.calls,
+            "sampled": self.sampled,
+            "mean_us": round(per_call * 1e6, 2),
+            # sampled time scaled up to all calls
+            "estimated_total_ms": round(per_call * self.calls * 1e3, 3),
+        }
+
+
+class Profiler:
+    """Counts every call and times one in ``sample_every`` of them.
+
+    Properties are profiled by swapping the property objects of the entity
+    classes for wrapped ones until ``stop`` puts the originals back. Update
+    callbacks are profiled by the hub through ``call``. Counting is a single
+    increment, so the profiler can stay armed while Home Assistant runs.
+    """
+
+    def __init__(self, sample_every: int = DEFAULT_SAMPLE_EVERY) -> None:
+        self.sample_every = sample_every
+        self.stats: dict[str, ProfileStat] = {}
+        self.started = time.time()
+        self._patched: list[tuple[type, str, property]] = []
+
+    def start(self, classes: list[type]) -> None:
+        """Wrap the properties that classes define themselves."""
+        for cls in classes:
+            for attr, value in list(vars(cls).items()):
+                if not isinstance(value, property) or value.fget is None:
+                    continue
+
+                wrapped = self._wrap(f"{cls.__name__}.{attr}", value.fget)
+                setattr(
+                    cls,
+                    attr,
+                    property(wrapped, value.fset, value.fdel, value.__doc__),
+                )
+                self._patched.append((cls, attr, value))
+
+    def stop(self) -> None:
+        """Restore the original properties."""
+        for cls, attr, value in reversed(self._patched):
+            setattr(cls, attr, value)
+        self._patched.clear()
+
+    def call(self, func: Callable[[], Any]) -> Any:
+        """Call and profile an update callback."""
+        name = getattr(func, "__qualname__", repr(func))
+        return self._measure(self._stat(name), func)
+
+    def _stat(self, name: str) -> ProfileStat:
+        if (stat := self.stats.get(name)) is None:
+            stat = self.stats[name] = ProfileStat()
+        return stat
+
+    def _wrap(self, name: str, func: Callable[..., Any]) -> Callable[..., Any]:
+        stat = self._stat(name)
+
+        @functools.wraps(func)
+        def wrapper(*args: Any) -> Any:
+            return self._measure(stat, func, *args)
+
+        return wrapper
+
+    def _measure(self, stat: ProfileStat, func: Callable[..., Any], *args: Any) -> Any:
+        stat.calls += 1
+        if stat.calls % self.sample_every:
+            return func(*args)
+
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            stat.seconds += time.perf_counter() - start
+            stat.sampled += 1
+
+    def report(self) -> dict[str, Any]:
+        """Return the stats, the most expensive first."""
+        rows: dict[str, dict[str, Any]] = {
+            name: stat.as_dict() for name, stat in self.stats.items()
+        }
+        stats = dict(
+            sorted(
+                rows.items(),
+                key=lambda row: row[1]["estimated_total_ms"],
+                reverse=True,
+            )
+        )
+        return {
+            "started": self.started,
+            "duration": time.time() - self.started,
+            "sample_every": self.sample_every,
+            "stats": stats,
+        }
+
+
+def write_report(path: str, report: dict[str, Any]) -> None:
+    """Write a profiler report as json, to be run in the executor."""
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
@@ -0,0 +1,223 @@
+"""Pacing of outbound SmartRent commands."""
+import asyncio
+import itertools
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+
+_LOGGER = logging.getLogger(__name__)
+
+# lower goes first
+PRIORITY_LOCK = 0
+PRIORITY_CLIMATE = 1
+PRIORITY_SWITCH = 2
+PRIORITY_LIGHT = 3
+
+DEFAULT_RATE = 10.0
+DEFAULT_BURST = 20
+DEFAULT_WORKERS = 10
+
+MIN_RATE = 0.5
+# commands per second the rate grows by after each command that went through
+RATE_INCREASE = 0.2
+MIN_BACKOFF_SECONDS = 1.0
+MAX_BACKOFF_SECONDS = 60.0
+# times a throttled command is queued again before it fails
+MAX_THROTTLED_RETRIES = 5
+
+HTTP_TOO_MANY_REQUESTS = 429
+
+# (priority, sequence, times throttled, command, future of the caller)
+_Job = tuple[int, int, int, Callable[[], Awaitable[Any]], "asyncio.Future[Any]"]
+
+
+def is_throttled(exc: BaseException) -> bool:
+    """Return True if exc is SmartRent telling us to slow down."""
+    # aiohttp errors carry .status, websockets handshake errors .status_code
+    # or .response.status_code depending on the version
+    response = getattr(exc, "response", None)
+    return HTTP_TOO_MANY_REQUESTS in (
+        getattr(exc, "status", None),
+        getattr(exc, "status_code", None),
+        getattr(response, "status_code", None),
+    )
+
+
+class CommandScheduler:
+    """Sends the commands of one account through a token bucket.
+
+    Commands wait in a priority queue so locks go out before lights. When
+    SmartRent throttles a command, the rate is halved, sending pauses for a
+    growing, jittered delay and the command is queued again instead of being
+    dropped, up to ``MAX_THROTTLED_RETRIES`` times. Every command that goes
+    through raises the rate a little, up to the configured maximum.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        rate: float = DEFAULT_RATE,
+        burst: int = DEFAULT_BURST,
+        workers: int = DEFAULT_WORKERS,
+    ) -> None:
+        self.hass = hass
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self._worker_count = workers
+
+        self._queue: asyncio.PriorityQueue[_Job] = asyncio.PriorityQueue()
+        self._sequence = itertools.count()
+        self._workers: list[asyncio.Task[None]] = []
+        # futures of the commands the workers took off the queue
+        self._in_flight: set[asyncio.Future[Any]] = set()
+
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        self._backoff = 0.0
+
+        self.sent = 0
+        self.failed = 0
+        self.throttled = 0
+        self.max_queue_depth = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """Return the number of commands waiting to be sent."""
+        return self._queue.qsize()
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return counters describing the scheduler."""
+        return {
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "sent": self.sent,
+            "failed": self.failed,
+            "throttled": self.throttled,
+            "rate": self.rate,
+        }
+
+    @callback
+    def async_start(self) -> None:
+        """Start the workers that send queued commands."""
+        self._workers = [
+            self.hass.async_create_background_task(
+                self._async_worker(), f"smartrent command worker {i}"
+            )
+            for i in range(self._worker_count)
+        ]
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop the workers and fail the commands queued or being sent."""
+        for worker in self._workers:
+            worker.cancel()
+        self._workers = []
+
+        futures = set(self._in_flight)
+        while not self._queue.empty():
+            *_, future = self._queue.get_nowait()
+            futures.add(future)
+        for future in futures:
+            if not future.done():
+                future.set_exception(
+                    HomeAssistantError("SmartRent command scheduler stopped")
+                )
+        self._in_flight.clear()
+
+    async def async_submit(
+        self, priority: int, command: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Queue command and return its result once it was sent."""
+        future: asyncio.Future[Any] = self.hass.loop.create_future()
+        self._queue.put_nowait((priority, next(self._sequence), 0, command, future))
+        self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+        return await future
+
+    async def _async_worker(self) -> None:
+        """Send queued commands one at a time, as the rate allows."""
+        while True:
+            job = await self._queue.get()
+            future = job[-1]
+            if future.done():
+                # the caller gave up waiting
+                continue
+
+            self._in_flight.add(future)
+            try:
+                await self._async_send(job)
+            finally:
+                self._in_flight.discard(future)
+
+    async def _async_send(self, job: _Job) -> None:
+        """Send one command and resolve its future, or queue it again."""
+        priority, sequence, throttled, command, future = job
+        await self._async_acquire()
+        try:
+            result = await command()
+        except Exception as exc:  # pylint: disable=broad-except
+            if is_throttled(exc):
+                self._async_throttled()
+                if throttled < MAX_THROTTLED_RETRIES:
+                    self._queue.put_nowait(
+                        (priority, sequence, throttled + 1, command, future)
+                    )
+                    return
+
+            self.failed += 1
+            if not future.done():
+                future.set_exception(exc)
+            return
+
+        self.sent += 1
+        self._backoff = 0.0
+        self.rate = min(self.max_rate, self.rate + RATE_INCREASE)
+        if not future.done():
+            future.set_result(result)
+
+    async def _async_acquire(self) -> None:
+        """Wait for a pause to end and for a token to be available."""
+        while True:
+            now = time.monotonic()
+            if now < self._paused_until:
+                await asyncio.sleep(self._paused_until - now)
+                continue
+
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._last_refill) * self.rate
+            )
+            self._last_refill = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    @callback
+    def _async_throttled(self) -> None:
+        """Slow down after SmartRent throttled a command."""
+        self.throttled += 1
+        if time.monotonic() < self._paused_until:
+            # commands sent before the pause started; it already accounts
+            # for them
+            return
+
+        self.rate = max(MIN_RATE, self.rate / 2)
+        self._backoff = min(
+            MAX_BACKOFF_SECONDS, max(MIN_BACKOFF_SECONDS, self._backoff * 2)
+        )
+        self._paused_until = time.monotonic() + self._backoff * random.uniform(1, 1.5)
+        self._tokens = 0
+        self._last_refill = self._paused_until
+
+        _LOGGER.warning(
+            "SmartRent is throttling commands, pausing %.1fs and slowing to %.1f/s",
+            self._backoff,
+            self.rate,
+        )
@@ -1,112 +1,204 @@
 """Platform for sensor integration."""
 
-from typing import Optional, Union
-
-from homeassistant.components.sensor import SensorEntity, SensorStateClass
-from homeassistant.const import PERCENTAGE, UnitOfTemperature
-from homeassistant.helpers.device_registry import DeviceEntryType
+from typing import Any, NamedTuple, Optional, Union
+
+from homeassistant.components.sensor import (
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import (
+    PERCENTAGE,
+    EntityCategory,
+    UnitOfTemperature,
+    UnitOfTime,
+)
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
 from smartrent import DoorLock, Sensor, Thermostat
-from smartrent.api import API
 
-from .const import CONFIGURATION_URL, PROPER_NAME
+from .const import CONFIGURATION_URL, DOMAIN, PROPER_NAME
+from .entity import SmartRentEntity, async_add_device_entities
+from .hub import SmartRentHub, read_field
+from .inventory import DeviceInventory
+from .metrics import DeviceMetrics, Histogram, Metrics
+from .models import SmartRentData
+
+# DeviceMetrics attribute, name, unit, state class
+METRIC_SENSORS = (
+    ("events", "Events", None, SensorStateClass.TOTAL_INCREASING),
+    (
+        "event_latency",
+        "Event latency",
+        UnitOfTime.MILLISECONDS,
+        SensorStateClass.MEASUREMENT,
+    ),
+    (
+        "command_latency",
+        "Command latency",
+        UnitOfTime.MILLISECONDS,
+        SensorStateClass.MEASUREMENT,
+    ),
+    ("errors", "Command errors", None, SensorStateClass.TOTAL_INCREASING),
+)
+
+
+class SensorKind(NamedTuple):
+    """Describes a sensor kind, shared by every device that has it.
+
+    Not a ``SensorEntityDescription`` subclass, defining one of those costs
+    more import time than the whole platform otherwise.
+    """
+
+    description: SensorEntityDescription
+    # device fields the state depends on
+    device_fields: tuple[str, ...]
+    unique_id_suffix: str
+
+
+def _kind(key: str, device_class: Optional[str] = None) -> SensorKind:
+    unit = None
+    if device_class == "temperature":
+        unit = UnitOfTemperature.FAHRENHEIT
+    elif device_class in ["humidity", "battery"]:
+        unit = PERCENTAGE
+
+    return SensorKind(
+        description=SensorEntityDescription(
+            key=key,
+            device_class=device_class,
+            state_class=SensorStateClass.MEASUREMENT if device_class else None,
+            native_unit_of_measurement=unit,
+        ),
+        device_fields=(key, "online"),
+        unique_id_suffix="".join([str(ord(char)) for char in key]),
+    )
+
+
+CURRENT_TEMP = _kind("current_temp", "temperature")
+MODE = _kind("mode")
+FAN_MODE = _kind("fan_mode")
+CURRENT_HUMIDITY = _kind("current_humidity", "humidity")
+BATTERY_LEVEL = _kind("battery_level", "battery")
+NOTIFICATION = _kind("notification")
+LOCKED = _kind("locked")
 
 
 async def async_setup_entry(hass, entry, async_add_entities):
     """Setup sensor platform."""
-    client: API = hass.data["smartrent"][entry.entry_id]
+    async_add_device_entities(hass, entry, async_add_entities, _build_sensors)
 
-    for thermo in client.get_thermostats():
+    data: SmartRentData = hass.data[DOMAIN][entry.entry_id]
+    if data.hub.metrics.enabled:
         async_add_entities(
-            [
-                SmartrentSensor(thermo, "current_temp", "temperature"),
-                SmartrentSensor(thermo, "mode"),
-            ]
+            SmartRentMetricsSensor(entry, data.hub.metrics, *description)
+            for description in METRIC_SENSORS
         )
+
+
+def _build_sensors(
+    hub: SmartRentHub, inventory: DeviceInventory
+) -> list["SmartrentSensor"]:
+    """Create the sensors for the devices in inventory."""
+    sensors: list[SmartrentSensor] = []
+
+    for thermo in inventory.get_thermostats():
+        sensors.append(SmartrentSensor(hub, thermo, CURRENT_TEMP))
+        sensors.append(SmartrentSensor(hub, thermo, MODE))
         if thermo.get_fan_mode():
-            async_add_entities([SmartrentSensor(thermo, "fan_mode")])
+            sensors.append(SmartrentSensor(hub, thermo, FAN_MODE))
         if thermo.get_current_humidity():
-            async_add_entities(
-                [SmartrentSensor(thermo, "current_humidity", "humidity")]
-            )
+            sensors.append(SmartrentSensor(hub, thermo, CURRENT_HUMIDITY))
 
-    for lock in client.get_locks():
-        async_add_entities(
-            [
-                SmartrentSensor(lock, "battery_level", "battery"),
-                SmartrentSensor(lock, "notification"),
-                SmartrentSensor(lock, "locked"),
-            ]
-        )
+    for lock in inventory.get_locks():
+        sensors.append(SmartrentSensor(hub, lock, BATTERY_LEVEL))
+        sensors.append(SmartrentSensor(hub, lock, NOTIFICATION))
+        sensors.append(SmartrentSensor(hub, lock, LOCKED))
 
-    for leak_sensor in client.get_leak_sensors():
-        async_add_entities([SmartrentSensor(leak_sensor, "battery_level", "battery")])
+    for sensor in inventory.get_leak_sensors() + inventory.get_motion_sensors():
+        sensors.append(SmartrentSensor(hub, sensor, BATTERY_LEVEL))
 
-    for motion_sensor in client.get_motion_sensors():
-        async_add_entities([SmartrentSensor(motion_sensor, "battery_level", "battery")])
+    return sensors
 
 
-class SmartrentSensor(SensorEntity):
+class SmartrentSensor(SmartRentEntity, SensorEntity):
     def __init__(
         self,
+        hub: SmartRentHub,
         device: Union[DoorLock, Thermostat, Sensor],
-        sensor_name: str,
-        device_class: Optional[str] = None,
+        kind: SensorKind,
     ) -> None:
-        super().__init__()
-        self.device = device
-        self.sensor_name = sensor_name
-        self._device_class = device_class
-
-        self.device.start_updater()
-        self.device.set_update_callback(self.async_schedule_update_ha_state)
+        super().__init__(hub, device)
+        self.entity_description = kind.description
+        self.device_fields = kind.device_fields
+        # built once, Home Assistant reads them on every state write
+        self._attr_unique_id = f"{device._device_id}{kind.unique_id_suffix}"
+        self._attr_name = f"{device._name} {kind.description.key}"
 
     @property
-    def available(self) -> bool:
-        return self.device.get_online()
-
-    @property
-    def should_poll(self):
-        """Return the polling state, if needed."""
-        return False
+    def unique_id(self) -> Optional[str]:
+        return self._attr_unique_id
 
     @property
-    def unique_id(self):
-        sname_id = "".join([str(ord(char)) for char in self.sensor_name])
-        uid = str(self.device._device_id) + str(sname_id)
-
-        return uid
+    def name(self) -> Optional[str]:
+        return self._attr_name
 
     @property
-    def name(self):
-        """Return the display name of this sensor."""
-        return self.device._name + " " + self.sensor_name
+    def available(self) -> bool:
+        return super().available and self.device.get_online()
 
     @property
     def native_value(self):
         """Return native value for entity."""
-        return getattr(self.device, f"get_{self.sensor_name}")()
+        return read_field(self.device, self.entity_description.key)
 
-    @property
-    def device_class(self):
-        return self._device_class
 
-    @property
-    def state_class(self):
-        return SensorStateClass.MEASUREMENT if self._device_class else None
+def _metric_value(metrics: DeviceMetrics, key: str) -> Optional[float]:
+    """Return a counter as is and a histogram as its mean in milliseconds."""
+    value = getattr(metrics, key)
+    if isinstance(value, Histogram):
+        return None if value.mean is None else round(value.mean * 1000, 2)
+    return value
 
-    @property
-    def native_unit_of_measurement(self):
-        if self._device_class == "temperature":
-            return UnitOfTemperature.FAHRENHEIT
-        if self._device_class in ["humidity", "battery"]:
-            return PERCENTAGE
 
-    @property
-    def device_info(self):
-        return dict(
-            identifiers={("id", self.device._device_id)},
+class SmartRentMetricsSensor(SensorEntity):
+    """Diagnostic sensor for one metric of an account, polled from memory."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(
+        self,
+        entry: ConfigEntry,
+        metrics: Metrics,
+        key: str,
+        name: str,
+        unit: Optional[str],
+        state_class: SensorStateClass,
+    ) -> None:
+        self.metrics = metrics
+        self.key = key
+
+        self._attr_unique_id = f"{entry.entry_id}_{key}"
+        self._attr_name = f"{PROPER_NAME} {name}"
+        self._attr_native_unit_of_measurement = unit
+        self._attr_state_class = state_class
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
+            name=f"{PROPER_NAME} {entry.title}",
             manufacturer=PROPER_NAME,
-            model=str(self.device.__class__.__name__),
             entry_type=DeviceEntryType.SERVICE,
             configuration_url=CONFIGURATION_URL,
         )
+
+    @property
+    def native_value(self) -> Optional[float]:
+        """Return the metric over all devices."""
+        return _metric_value(self.metrics.total, self.key)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the metric per device class."""
+        return {
+            name: _metric_value(metrics, self.key)
+            for name, metrics in self.metrics.device_classes.items()
+        }
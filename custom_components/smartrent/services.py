@@ -0,0 +1,287 @@
+"""Services for the SmartRent integration."""
+import asyncio
+import logging
+import math
+import time
+from typing import TYPE_CHECKING, Any, Optional
+
+import voluptuous as vol
+from homeassistant.const import Platform
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.service import async_extract_entity_ids
+from smartrent import DoorLock
+
+from .activity import HISTORY_SIZE
+from .const import DEFAULT_SAMPLE_EVERY, DOMAIN, PROFILER_KEY
+from .models import SmartRentData
+
+if TYPE_CHECKING:
+    from .lock import SmartrentLock
+    from .profiler import Profiler
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_BULK_SET_LOCKED = "bulk_set_locked"
+SERVICE_START_PROFILE = "start_profile"
+SERVICE_STOP_PROFILE = "stop_profile"
+SERVICE_GET_LOCK_ACTIVITY = "get_lock_activity"
+
+ATTR_LOCKED = "locked"
+ATTR_MAX_CONCURRENCY = "max_concurrency"
+ATTR_RETRIES = "retries"
+ATTR_TIMEOUT = "timeout"
+ATTR_SAMPLE_EVERY = "sample_every"
+ATTR_LIMIT = "limit"
+
+BULK_SET_LOCKED_SCHEMA = cv.make_entity_service_schema(
+    {
+        vol.Required(ATTR_LOCKED): cv.boolean,
+        vol.Optional(ATTR_MAX_CONCURRENCY, default=10): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=100)
+        ),
+        vol.Optional(ATTR_RETRIES, default=2): vol.All(
+            vol.Coerce(int), vol.Range(min=0, max=10)
+        ),
+        vol.Optional(ATTR_TIMEOUT, default=30): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=300)
+        ),
+    }
+)
+
+START_PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_SAMPLE_EVERY, default=DEFAULT_SAMPLE_EVERY): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=10000)
+        ),
+    }
+)
+
+GET_LOCK_ACTIVITY_SCHEMA = cv.make_entity_service_schema(
+    {
+        vol.Optional(ATTR_LIMIT, default=HISTORY_SIZE): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=HISTORY_SIZE)
+        ),
+    }
+)
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the services of the integration."""
+
+    async def async_bulk_set_locked(call: ServiceCall) -> ServiceResponse:
+        locks = _async_get_lock_entities(
+            hass, await async_extract_entity_ids(hass, call)
+        )
+        return await async_set_locked_many(
+            locks,
+            call.data[ATTR_LOCKED],
+            max_concurrency=call.data[ATTR_MAX_CONCURRENCY],
+            retries=call.data[ATTR_RETRIES],
+            timeout=call.data[ATTR_TIMEOUT],
+        )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_BULK_SET_LOCKED,
+        async_bulk_set_locked,
+        schema=BULK_SET_LOCKED_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def async_get_lock_activity(call: ServiceCall) -> ServiceResponse:
+        locks = _async_get_locks(hass, await async_extract_entity_ids(hass, call))
+        return {
+            entity_id: data.activity.get(lock._device_id, call.data[ATTR_LIMIT])
+            for entity_id, (lock, data) in locks.items()
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_LOCK_ACTIVITY,
+        async_get_lock_activity,
+        schema=GET_LOCK_ACTIVITY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    async def async_start_profile(call: ServiceCall) -> None:
+        if PROFILER_KEY in hass.data:
+            raise HomeAssistantError("A SmartRent profile is already running")
+
+        # only needed while profiling, so not imported with the integration
+        # pylint: disable-next=import-outside-toplevel
+        from .entity import SmartRentEntity
+        from .profiler import Profiler
+
+        profiler = Profiler(call.data[ATTR_SAMPLE_EVERY])
+        profiler.start(_entity_classes(SmartRentEntity))
+        hass.data[PROFILER_KEY] = profiler
+        _set_hub_profiler(hass, profiler)
+
+    async def async_stop_profile(call: ServiceCall) -> ServiceResponse:
+        if (profiler := hass.data.pop(PROFILER_KEY, None)) is None:
+            raise HomeAssistantError("No SmartRent profile is running")
+
+        profiler.stop()
+        _set_hub_profiler(hass, None)
+
+        report = profiler.report()
+        path = hass.config.path(f"smartrent_profile_{int(profiler.started)}.json")
+        # pylint: disable-next=import-outside-toplevel
+        from .profiler import write_report
+
+        await hass.async_add_executor_job(write_report, path, report)
+        _LOGGER.info("Wrote SmartRent profile to %s", path)
+        return {"path": path, **report}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_START_PROFILE,
+        async_start_profile,
+        schema=START_PROFILE_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_STOP_PROFILE,
+        async_stop_profile,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+
+def _entity_classes(cls: type) -> list[type]:
+    """Return cls and all of its subclasses."""
+    classes = [cls]
+    for subclass in cls.__subclasses__():
+        classes.extend(_entity_classes(subclass))
+    return classes
+
+
+def _set_hub_profiler(hass: HomeAssistant, profiler: Optional["Profiler"]) -> None:
+    """Let the hub of every entry profile the update callbacks it calls."""
+    entries: "dict[str, SmartRentData]" = hass.data.get(DOMAIN, {})
+    for data in entries.values():
+        data.hub.profiler = profiler
+
+
+def _async_get_locks(
+    hass: HomeAssistant, entity_ids: set[str]
+) -> "dict[str, tuple[DoorLock, SmartRentData]]":
+    """Map the SmartRent lock entities among entity_ids to their devices.
+
+    Each device comes with the data of its config entry.
+    """
+    entity_registry = er.async_get(hass)
+    entries: "dict[str, SmartRentData]" = hass.data.get(DOMAIN, {})
+
+    locks: "dict[str, tuple[DoorLock, SmartRentData]]" = {}
+    for entity_id in entity_ids:
+        entity_entry = entity_registry.async_get(entity_id)
+        if (
+            entity_entry is None
+            or entity_entry.platform != DOMAIN
+            or entity_entry.domain != Platform.LOCK
+            or (data := entries.get(entity_entry.config_entry_id)) is None
+        ):
+            continue
+
+        device = data.hub.get_device(int(entity_entry.unique_id))
+        if isinstance(device, DoorLock):
+            locks[entity_id] = (device, data)
+
+    return locks
+
+
+def _async_get_lock_entities(
+    hass: HomeAssistant, entity_ids: set[str]
+) -> "dict[str, SmartrentLock]":
+    """Map the SmartRent lock entities among entity_ids to the entities."""
+    if (component := hass.data.get(Platform.LOCK)) is None:
+        return {}
+
+    return {
+        entity_id: entity
+        for entity_id in _async_get_locks(hass, entity_ids)
+        if (entity := component.get_entity(entity_id)) is not None
+    }
+
+
+async def async_set_locked_many(
+    locks: "dict[str, SmartrentLock]",
+    locked: bool,
+    max_concurrency: int,
+    retries: int,
+    timeout: float,
+) -> dict[str, Any]:
+    """Lock or unlock many locks with at most max_concurrency in flight.
+
+    Every lock gets ``retries`` more attempts of at most ``timeout`` seconds.
+    Commands go through the entities, like those of the lock services, so
+    they are scheduled and recorded the same way.
+    Returns the outcome per entity plus throughput and latency figures.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _async_set_locked(entity: "SmartrentLock") -> dict[str, Any]:
+        lock = entity.device
+        error: Optional[BaseException] = None
+        for attempt in range(1, retries + 2):
+            try:
+                async with semaphore:
+                    start = time.monotonic()
+                    await asyncio.wait_for(
+                        entity.async_send_command(lock.async_set_locked, locked),
+                        timeout,
+                    )
+            except Exception as exc:  # pylint: disable=broad-except
+                error = exc
+                _LOGGER.debug(
+                    "Attempt %s to set %s locked=%s failed: %r",
+                    attempt,
+                    lock._name,
+                    locked,
+                    exc,
+                )
+                continue
+
+            return {
+                "success": True,
+                "attempts": attempt,
+                "latency": time.monotonic() - start,
+            }
+
+        return {"success": False, "attempts": retries + 1, "error": repr(error)}
+
+    start = time.monotonic()
+    outcomes = await asyncio.gather(
+        *[_async_set_locked(entity) for entity in locks.values()]
+    )
+    duration = time.monotonic() - start
+
+    results = dict(zip(locks, outcomes))
+    latencies = sorted(outcome["latency"] for outcome in outcomes if outcome["success"])
+    succeeded = len(latencies)
+
+    return {
+        "results": results,
+        "succeeded": succeeded,
+        "failed": len(outcomes) - succeeded,
+        "duration": duration,
+        "throughput": succeeded / duration if duration else 0.0,
+        "latency_p50": _percentile(latencies, 50),
+        "latency_p95": _percentile(latencies, 95),
+    }
+
+
+def _percentile(ordered: list[float], percent: float) -> Optional[float]:
+    """Return the nearest-rank percentile of an ordered list."""
+    if not ordered:
+        return None
+
+    return ordered[max(math.ceil(percent / 100 * len(ordered)) - 1, 0)]
@@ -0,0 +1,56 @@
+"""HTTP session used for SmartRent api traffic."""
+from typing import Any
+
+import aiohttp
+from homeassistant.util.ssl import get_default_context
+
+# SmartRent's api lives on a single host
+CONNECTION_LIMIT = 20
+CONNECTION_LIMIT_PER_HOST = 20
+KEEPALIVE_TIMEOUT = 60
+DNS_CACHE_TTL = 300
+REQUEST_TIMEOUT = 30
+
+
+def create_session() -> aiohttp.ClientSession:
+    """Create a session that keeps its own pool of connections to SmartRent.
+
+    Using a dedicated session keeps SmartRent requests from competing with
+    other integrations for the connections of Home Assistant's shared session.
+    It verifies certificates like that session does, with Home Assistant's
+    default ssl context.
+    """
+    connector = aiohttp.TCPConnector(
+        ssl=get_default_context(),
+        limit=CONNECTION_LIMIT,
+        limit_per_host=CONNECTION_LIMIT_PER_HOST,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=DNS_CACHE_TTL,
+        enable_cleanup_closed=True,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+    )
+
+
+def session_stats(session: aiohttp.ClientSession) -> dict[str, Any]:
+    """Return the limits and usage of the connection pool of session.
+
+    aiohttp has no public api for the usage, it is read from private
+    attributes of the connector and left out once those disappear.
+    """
+    connector = session.connector
+    if connector is None or session.closed:
+        return {"closed": True}
+
+    stats: dict[str, Any] = {
+        "closed": False,
+        "limit": connector.limit,
+        "limit_per_host": connector.limit_per_host,
+    }
+    if (acquired := getattr(connector, "_acquired", None)) is not None:
+        stats["in_use"] = len(acquired)
+    if (conns := getattr(connector, "_conns", None)) is not None:
+        stats["idle"] = sum(len(idle) for idle in conns.values())
+    return stats
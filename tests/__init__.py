@@ -0,0 +1,34 @@
+"""Tests for the SmartRent integration."""
+import asyncio
+import time
+from typing import Callable, Union
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.smartrent.const import DOMAIN
+from custom_components.smartrent.hub import SmartRentHub
+
+
+def entity_id_of(hass: HomeAssistant, platform: str, unique_id: Union[int, str]) -> str:
+    """Return the entity id of the SmartRent entity with unique_id."""
+    entity_id = er.async_get(hass).async_get_entity_id(platform, DOMAIN, unique_id)
+    assert entity_id, f"no {platform} entity for {unique_id}"
+    return entity_id
+
+
+async def async_wait_for(condition: Callable[[], object], timeout: float = 5) -> None:
+    """Let the event loop run until condition is true."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+
+async def async_wait_subscribed(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Wait until push updates of every device of entry are received."""
+    hub: SmartRentHub = hass.data[DOMAIN][entry.entry_id].hub
+    await async_wait_for(
+        lambda: all(hub.is_subscribed(device._device_id) for device in hub.devices)
+    )
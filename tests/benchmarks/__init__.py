@@ -0,0 +1,25 @@
+"""Benchmarks of the hot paths of the SmartRent integration.
+
+They only run with ``--benchmark``. Every result is checked against
+``thresholds.json`` and, with ``--benchmark-baseline``, against an earlier
+``--benchmark-json`` output, and the benchmark fails when it got worse.
+"""
+from ..fake_smartrent import FakeSmartRent
+
+# share of each device type in a benchmark fleet
+FLEET_MIX = {
+    "locks": 0.3,
+    "thermostats": 0.2,
+    "binary_switches": 0.2,
+    "multilevel_switches": 0.1,
+    "leak_sensors": 0.1,
+    "motion_sensors": 0.1,
+}
+
+
+def add_mixed_fleet(smartrent: FakeSmartRent, size: int) -> list[int]:
+    """Add size devices of every type, mostly locks, returning their ids."""
+    counts = {kind: int(size * share) for kind, share in FLEET_MIX.items()}
+    # rounding leftovers become locks
+    counts["locks"] += size - sum(counts.values())
+    return smartrent.add_fleet(**counts)
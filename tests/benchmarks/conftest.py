@@ -0,0 +1,124 @@
+"""Recording of benchmark results and the regression gate."""
+import json
+import platform
+import time
+from pathlib import Path
+from typing import Any, Optional, Protocol
+
+import pytest
+from homeassistant.const import __version__ as HA_VERSION
+
+THRESHOLDS = Path(__file__).with_name("thresholds.json")
+
+# results of this run, by name
+RESULTS: dict[str, dict[str, Any]] = {}
+
+
+class Benchmark(Protocol):
+    def __call__(
+        self, name: str, value: float, unit: str, higher_is_better: bool
+    ) -> None:
+        ...
+
+
+def pytest_collection_modifyitems(
+    config: pytest.Config, items: list[pytest.Item]
+) -> None:
+    if config.getoption("--benchmark"):
+        return
+
+    skip = pytest.mark.skip(reason="benchmarks only run with --benchmark")
+    here = Path(__file__).parent
+    for item in items:
+        if item.path.is_relative_to(here):
+            item.add_marker(skip)
+
+
+def pytest_generate_tests(metafunc: pytest.Metafunc) -> None:
+    if "fleet_size" in metafunc.fixturenames:
+        sizes = metafunc.config.getoption("--benchmark-fleet-sizes")
+        metafunc.parametrize("fleet_size", [int(size) for size in sizes.split(",")])
+
+
+def _load(path: Optional[str]) -> dict[str, Any]:
+    if not path:
+        return {}
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+@pytest.fixture(scope="session")
+def thresholds() -> dict[str, dict[str, float]]:
+    return _load(str(THRESHOLDS))
+
+
+@pytest.fixture(scope="session")
+def baseline(request: pytest.FixtureRequest) -> dict[str, dict[str, Any]]:
+    return _load(request.config.getoption("--benchmark-baseline")).get("results", {})
+
+
+@pytest.fixture
+def benchmark(
+    request: pytest.FixtureRequest,
+    thresholds: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, Any]],
+) -> Benchmark:
+    """Return a function that records a result and fails if it regressed.
+
+    A result regressed when it is beyond its threshold, or worse than the
+    baseline by more than the tolerance.
+    """
+    tolerance: float = request.config.getoption("--benchmark-tolerance")
+
+    def _record(name: str, value: float, unit: str, higher_is_better: bool) -> None:
+        RESULTS[name] = {
+            "value": value,
+            "unit": unit,
+            "higher_is_better": higher_is_better,
+        }
+
+        limits = thresholds.get(name, {})
+        if "min" in limits and value < limits["min"]:
+            pytest.fail(f"{name} is {value:.4g} {unit}, below {limits['min']}")
+        if "max" in limits and value > limits["max"]:
+            pytest.fail(f"{name} is {value:.4g} {unit}, above {limits['max']}")
+
+        if (previous := baseline.get(name)) is None:
+            return
+        if higher_is_better:
+            limit = previous["value"] * (1 - tolerance)
+            worse = value < limit
+        else:
+            limit = previous["value"] * (1 + tolerance)
+            worse = value > limit
+        if worse:
+            pytest.fail(
+                f"{name} is {value:.4g} {unit}, "
+                f"baseline {previous['value']:.4g} allows {limit:.4g}"
+            )
+
+    return _record
+
+
+def pytest_sessionfinish(session: pytest.Session) -> None:
+    if not RESULTS or not (path := session.config.getoption("--benchmark-json")):
+        return
+
+    output = {
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "homeassistant": HA_VERSION,
+        "results": RESULTS,
+    }
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(output, file, indent=2, sort_keys=True)
+
+
+def pytest_terminal_summary(terminalreporter: Any) -> None:
+    if not RESULTS:
+        return
+
+    terminalreporter.section("SmartRent benchmarks")
+    for name, result in RESULTS.items():
+        terminalreporter.write_line(f"{name}: {result['value']:.4g} {result['unit']}")
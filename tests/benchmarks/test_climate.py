@@ -0,0 +1,61 @@
+"""Benchmark of the device reads behind a thermostat state write."""
+from collections import Counter
+from contextlib import ExitStack
+from functools import wraps
+from typing import Any, Callable
+from unittest.mock import patch
+
+from homeassistant.components.climate import DOMAIN as CLIMATE_DOMAIN
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_component import EntityComponent
+from smartrent import Thermostat
+
+from custom_components.smartrent.climate import SmartrentThermostat
+
+from ..fake_smartrent import FakeSmartRent
+
+THERMOSTATS = 1000
+
+
+def _counted(getter: Callable[..., Any], calls: Counter) -> Callable[..., Any]:
+    @wraps(getter)
+    def _get(*args: Any) -> Any:
+        calls[getter.__name__] += 1
+        return getter(*args)
+
+    return _get
+
+
+async def test_getter_calls_per_write(
+    hass: HomeAssistant, smartrent: FakeSmartRent, setup_integration, benchmark
+) -> None:
+    smartrent.add_fleet(thermostats=THERMOSTATS)
+    await setup_integration()
+    component: EntityComponent = hass.data[CLIMATE_DOMAIN]
+    thermostats = [
+        entity
+        for entity in component.entities
+        if isinstance(entity, SmartrentThermostat)
+    ]
+    assert len(thermostats) == THERMOSTATS
+
+    calls: Counter = Counter()
+    with ExitStack() as stack:
+        for name in dir(Thermostat):
+            if name.startswith("get_"):
+                getter = getattr(Thermostat, name)
+                stack.enter_context(
+                    patch.object(Thermostat, name, _counted(getter, calls))
+                )
+
+        # what the hub calls when a device reported new data
+        for thermostat in thermostats:
+            thermostat._async_device_updated()
+
+    # every field is read once, however many properties the write reads
+    benchmark(
+        "climate_getter_calls_per_write",
+        sum(calls.values()) / THERMOSTATS,
+        "calls",
+        higher_is_better=False,
+    )
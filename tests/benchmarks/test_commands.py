@@ -0,0 +1,110 @@
+"""Benchmarks of command round trips through the integration."""
+import time
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from homeassistant.components.climate import SERVICE_SET_TEMPERATURE
+from homeassistant.components.light import ATTR_BRIGHTNESS
+from homeassistant.const import (
+    ATTR_ENTITY_ID,
+    ATTR_TEMPERATURE,
+    SERVICE_LOCK,
+    SERVICE_TURN_ON,
+    SERVICE_UNLOCK,
+)
+from homeassistant.core import HomeAssistant
+from homeassistant.util.unit_system import US_CUSTOMARY_SYSTEM
+
+from custom_components.smartrent.const import DOMAIN
+from custom_components.smartrent.models import SmartRentData
+
+from .. import async_wait_for, async_wait_subscribed, entity_id_of
+from ..fake_smartrent import FakeSmartRent
+
+DEVICES = 100
+
+# (service, service data, value the devices receive), one per round
+_Round = tuple[str, dict[str, Any], str]
+
+# platform: fleet argument, attribute commands set, rounds. the best round
+# counts, every round changes the state of all devices
+COMMANDS: dict[str, tuple[str, str, list[_Round]]] = {
+    "lock": (
+        "locks",
+        "locked",
+        [
+            (SERVICE_UNLOCK, {}, "false"),
+            (SERVICE_LOCK, {}, "true"),
+            (SERVICE_UNLOCK, {}, "false"),
+        ],
+    ),
+    "light": (
+        "multilevel_switches",
+        "level",
+        [
+            (SERVICE_TURN_ON, {ATTR_BRIGHTNESS: brightness}, level)
+            for brightness, level in ((128, "50"), (255, "100"), (64, "25"))
+        ],
+    ),
+    "climate": (
+        "thermostats",
+        "cooling_setpoint",
+        [
+            (SERVICE_SET_TEMPERATURE, {ATTR_TEMPERATURE: setpoint}, str(setpoint))
+            for setpoint in (65, 66, 67)
+        ],
+    ),
+}
+
+
+@pytest.mark.parametrize("platform", COMMANDS)
+async def test_commands_per_second(
+    hass: HomeAssistant,
+    smartrent: FakeSmartRent,
+    setup_integration,
+    benchmark,
+    platform: str,
+) -> None:
+    fleet, attribute, rounds = COMMANDS[platform]
+    hass.config.units = US_CUSTOMARY_SYSTEM
+    devices = smartrent.add_fleet(**{fleet: DEVICES})
+    entry = await setup_integration()
+    # unavailable entities are skipped by service calls
+    await async_wait_subscribed(hass, entry)
+    data: SmartRentData = hass.data[DOMAIN][entry.entry_id]
+    # measure the integration, not the pacing of the command scheduler
+    data.scheduler.rate = data.scheduler.max_rate = 1000.0
+    data.scheduler.burst = DEVICES
+    entity_ids = [entity_id_of(hass, platform, device) for device in devices]
+
+    best = float("inf")
+    # no waiting for further slider steps
+    with patch("custom_components.smartrent.climate.COMMAND_DELAY", 0), patch(
+        "custom_components.smartrent.light.COMMAND_DELAY", 0
+    ):
+        for service, service_data, value in rounds:
+            smartrent.commands.clear()
+            start = time.perf_counter()
+            await hass.services.async_call(
+                platform,
+                service,
+                {ATTR_ENTITY_ID: entity_ids, **service_data},
+                blocking=True,
+            )
+            # the echo of every command reached the device
+            await async_wait_for(lambda: len(smartrent.commands) == DEVICES)
+            await hass.async_block_till_done()
+            best = min(best, time.perf_counter() - start)
+
+            for device in devices:
+                sent = smartrent.commands_for(device, attribute)
+                # setpoints go out as floats
+                assert [command.removesuffix(".0") for command in sent] == [value]
+
+    benchmark(
+        f"{platform}_commands_per_second",
+        DEVICES / best,
+        "1/s",
+        higher_is_better=True,
+    )
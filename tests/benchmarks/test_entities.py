@@ -0,0 +1,67 @@
+"""Microbenchmark of reading the identity of entities."""
+import time
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.smartrent.binary_sensor import _build_binary_sensors
+from custom_components.smartrent.climate import _build_thermostats
+from custom_components.smartrent.const import DOMAIN
+from custom_components.smartrent.entity import SmartRentEntity
+from custom_components.smartrent.hub import SmartRentHub
+from custom_components.smartrent.inventory import DeviceInventory, create_device
+from custom_components.smartrent.light import _build_lights
+from custom_components.smartrent.lock import _build_locks
+from custom_components.smartrent.sensor import _build_sensors
+from custom_components.smartrent.switch import _build_switches
+
+from ..fake_smartrent import FakeSmartRent
+from . import add_mixed_fleet
+
+ENTITIES = 10_000
+# the best round counts
+ROUNDS = 5
+
+BUILDERS = [
+    _build_binary_sensors,
+    _build_thermostats,
+    _build_lights,
+    _build_locks,
+    _build_sensors,
+    _build_switches,
+]
+
+
+async def test_identity_reads(
+    hass: HomeAssistant, smartrent: FakeSmartRent, setup_integration, benchmark
+) -> None:
+    entry = await setup_integration()
+    hub: SmartRentHub = hass.data[DOMAIN][entry.entry_id].hub
+    # more devices than needed, every device has at least one entity
+    add_mixed_fleet(smartrent, ENTITIES)
+    devices = [
+        device
+        for data in smartrent.devices.values()
+        if (device := create_device(hub.api.client, data))
+    ]
+    inventory = DeviceInventory(devices)
+    entities: list[SmartRentEntity] = [
+        entity for build in BUILDERS for entity in build(hub, inventory)
+    ][:ENTITIES]
+    assert len(entities) == ENTITIES
+
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        # what Home Assistant reads while adding and registering entities
+        for entity in entities:
+            entity.unique_id
+            entity.name
+            entity.device_info
+        best = min(best, time.perf_counter() - start)
+
+    benchmark(
+        "identity_read_ns_per_entity",
+        best / ENTITIES * 1e9,
+        "ns",
+        higher_is_better=False,
+    )
@@ -0,0 +1,36 @@
+"""Benchmark of push events, from the websocket to the state machine."""
+import time
+
+from homeassistant.const import STATE_OFF, STATE_ON
+from homeassistant.core import HomeAssistant
+
+from .. import async_wait_for, async_wait_subscribed, entity_id_of
+from ..fake_smartrent import FakeSmartRent
+from . import add_mixed_fleet
+
+FLEET_SIZE = 100
+EVENTS = 2000
+# the best round counts
+ROUNDS = 3
+
+
+async def test_events_per_second(
+    hass: HomeAssistant, smartrent: FakeSmartRent, setup_integration, benchmark
+) -> None:
+    devices = add_mixed_fleet(smartrent, FLEET_SIZE)
+    # toggled after the events, the websocket delivers them in order
+    sentinel = smartrent.add_binary_switch()
+    entry = await setup_integration()
+    await async_wait_subscribed(hass, entry)
+    sentinel_id = entity_id_of(hass, "switch", sentinel)
+
+    best = float("inf")
+    for index in range(ROUNDS):
+        state = STATE_OFF if index % 2 else STATE_ON
+        start = time.perf_counter()
+        await smartrent.async_stream_events(EVENTS, device_ids=devices)
+        await smartrent.async_push(sentinel, "on", str(state == STATE_ON).lower())
+        await async_wait_for(lambda: hass.states.get(sentinel_id).state == state)
+        best = min(best, time.perf_counter() - start)
+
+    benchmark("events_per_second", EVENTS / best, "1/s", higher_is_better=True)
@@ -0,0 +1,77 @@
+"""Benchmarks of the time it takes to import the integration."""
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+from custom_components.smartrent.const import PLATFORMS
+
+ROOT = Path(__file__).parents[2]
+PACKAGE = "custom_components.smartrent"
+ROUNDS = 7
+
+# what Home Assistant has imported by the time it loads the integration and
+# each of its platforms
+PRELOAD = [
+    "homeassistant.config_entries",
+    "homeassistant.helpers.aiohttp_client",
+    "homeassistant.helpers.config_validation",
+    "homeassistant.helpers.entity_platform",
+    "homeassistant.helpers.storage",
+    "homeassistant.helpers.update_coordinator",
+    *(f"homeassistant.components.{platform}" for platform in PLATFORMS),
+]
+
+# import time: self [us] | cumulative | imported package
+_LINE = re.compile(r"import time:\s+\d+ \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def _import_times() -> dict[str, float]:
+    """Import the integration and its platforms in a fresh interpreter.
+
+    Returns the cumulative milliseconds of the package and each platform,
+    taken from ``python -X importtime``.
+    """
+    modules = [PACKAGE, *(f"{PACKAGE}.{platform}" for platform in PLATFORMS)]
+    preload = "; ".join(f"import {module}" for module in PRELOAD)
+    code = f"{preload}; import sys; sys.stderr.write('--\\n'); " + "; ".join(
+        f"import {module}" for module in modules
+    )
+    # installs import from cached bytecode
+    env = {**os.environ}
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    times = {}
+    for line in result.stderr.split("--\n", 1)[1].splitlines():
+        # only top level imports, nested ones are part of their importer
+        if (match := _LINE.match(line)) and not match[2] and match[3] in modules:
+            times[match[3]] = int(match[1]) / 1000
+    return times
+
+
+def test_import_time(benchmark) -> None:
+    # the first round compiles what changed since the last run
+    _import_times()
+    rounds = [_import_times() for _ in range(ROUNDS)]
+    # the fastest round has the least noise from the rest of the machine
+    best = {module: min(times[module] for times in rounds) for module in rounds[0]}
+
+    benchmark("import_package_ms", best[PACKAGE], "ms", higher_is_better=False)
+    for platform in PLATFORMS:
+        benchmark(
+            f"import_{platform}_ms",
+            best[f"{PACKAGE}.{platform}"],
+            "ms",
+            higher_is_better=False,
+        )
+    # what loading the integration costs in total, whichever module pays it
+    benchmark("import_total_ms", sum(best.values()), "ms", higher_is_better=False)
@@ -0,0 +1,46 @@
+"""Benchmark of reloading an entry after its options changed."""
+import time
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant
+
+from custom_components.smartrent.const import CONF_DISCOVERY_INTERVAL
+
+from ..fake_smartrent import FakeSmartRent
+from . import add_mixed_fleet
+
+FLEET_SIZE = 1000
+
+
+async def test_reload_time(
+    hass: HomeAssistant, smartrent: FakeSmartRent, setup_integration, benchmark
+) -> None:
+    add_mixed_fleet(smartrent, FLEET_SIZE)
+    entry = await setup_integration()
+    sessions = smartrent.requests["sessions"]
+
+    # only an option changed, the session and entities are kept
+    start = time.perf_counter()
+    hass.config_entries.async_update_entry(
+        entry, options={**entry.options, CONF_DISCOVERY_INTERVAL: 30}
+    )
+    await hass.async_block_till_done()
+    options_seconds = time.perf_counter() - start
+    assert smartrent.requests["sessions"] == sessions
+
+    # what every reload did before, unloading and setting up again
+    start = time.perf_counter()
+    assert await hass.config_entries.async_reload(entry.entry_id)
+    await hass.async_block_till_done()
+    full_seconds = time.perf_counter() - start
+
+    assert entry.state is ConfigEntryState.LOADED
+    benchmark(
+        f"options_reload_seconds_{FLEET_SIZE}",
+        options_seconds,
+        "s",
+        higher_is_better=False,
+    )
+    benchmark(
+        f"full_reload_seconds_{FLEET_SIZE}", full_seconds, "s", higher_is_better=False
+    )
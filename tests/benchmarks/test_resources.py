@@ -0,0 +1,46 @@
+"""Benchmark of the sockets, tasks and memory an entry holds on to."""
+import asyncio
+import tracemalloc
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from .. import async_wait_subscribed
+from ..fake_smartrent import FakeSmartRent
+from . import add_mixed_fleet
+
+
+@pytest.mark.parametrize("devices", [1, 100, 1000])
+async def test_resources_per_entry(
+    hass: HomeAssistant,
+    smartrent: FakeSmartRent,
+    setup_integration,
+    benchmark,
+    devices: int,
+) -> None:
+    add_mixed_fleet(smartrent, devices)
+    tasks_before = len(asyncio.all_tasks())
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        entry = await setup_integration()
+        await async_wait_subscribed(hass, entry)
+        memory = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+    # includes the fake's handler of the connection; the count must not
+    # grow with the devices
+    tasks = len(asyncio.all_tasks()) - tasks_before
+    benchmark(
+        f"websockets_{devices}",
+        smartrent.open_connections,
+        "sockets",
+        higher_is_better=False,
+    )
+    benchmark(f"tasks_{devices}", tasks, "tasks", higher_is_better=False)
+    # everything setup allocated and kept, the loaded platforms included
+    benchmark(
+        f"memory_mib_{devices}", memory / 1024 / 1024, "MiB", higher_is_better=False
+    )
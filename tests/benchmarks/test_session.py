@@ -0,0 +1,99 @@
+"""Benchmark of the SmartRent session's connection pool under load."""
+import asyncio
+import statistics
+import time
+from typing import AsyncIterator
+
+import aiohttp
+import pytest
+from aiohttp import web
+from homeassistant.core import HomeAssistant
+
+from custom_components.smartrent.session import create_session
+
+CONCURRENT = 100
+# the best round counts, the first also opens the pool
+ROUNDS = 3
+
+
+class _StandIn:
+    """Local HTTP server answering like the command endpoint does."""
+
+    def __init__(self) -> None:
+        self.peers: set[tuple[str, int]] = set()
+        self.url = ""
+        self._runner: web.AppRunner
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        # each peer address is one connection of a client
+        assert request.transport
+        self.peers.add(request.transport.get_extra_info("peername"))
+        return web.json_response({"ok": True})
+
+    async def async_start(self) -> None:
+        app = web.Application()
+        app.router.add_post("/command", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.url = f"http://127.0.0.1:{port}/command"
+
+    async def async_stop(self) -> None:
+        await self._runner.cleanup()
+
+
+@pytest.fixture
+async def stand_in(socket_enabled: None) -> AsyncIterator[_StandIn]:
+    server = _StandIn()
+    await server.async_start()
+    yield server
+    await server.async_stop()
+
+
+async def _best_latency_ms(session: aiohttp.ClientSession, url: str) -> float:
+    """Send rounds of concurrent requests, returning the best median latency."""
+
+    async def _async_request() -> float:
+        start = time.perf_counter()
+        async with session.post(url, json={"value": "true"}) as response:
+            await response.read()
+        return time.perf_counter() - start
+
+    best = float("inf")
+    for _ in range(ROUNDS):
+        latencies = await asyncio.gather(*[_async_request() for _ in range(CONCURRENT)])
+        best = min(best, statistics.median(latencies))
+    return best * 1000
+
+
+async def test_connection_reuse(
+    hass: HomeAssistant, stand_in: _StandIn, benchmark
+) -> None:
+    async with create_session() as session:
+        reused_ms = await _best_latency_ms(session, stand_in.url)
+    connections = len(stand_in.peers)
+
+    stand_in.peers.clear()
+    # a new connection for every request
+    async with aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(force_close=True, limit=0)
+    ) as session:
+        fresh_ms = await _best_latency_ms(session, stand_in.url)
+    assert len(stand_in.peers) == CONCURRENT * ROUNDS
+    assert reused_ms < fresh_ms
+
+    benchmark(
+        f"session_latency_ms_{CONCURRENT}", reused_ms, "ms", higher_is_better=False
+    )
+    benchmark(
+        f"no_reuse_latency_ms_{CONCURRENT}", fresh_ms, "ms", higher_is_better=False
+    )
+    # the pool never opens more than its limit, however many requests wait
+    benchmark(
+        f"session_connections_{CONCURRENT}",
+        connections,
+        "connections",
+        higher_is_better=False,
+    )
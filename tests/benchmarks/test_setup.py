@@ -0,0 +1,72 @@
+"""Benchmarks of setting up an entry and of its memory use."""
+import time
+import tracemalloc
+from typing import Any
+from unittest.mock import patch
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant
+
+from ..fake_smartrent import FakeSmartRent
+from . import add_mixed_fleet
+
+MEMORY_FLEET_SIZE = 100
+
+
+async def test_setup_time(
+    hass: HomeAssistant,
+    smartrent: FakeSmartRent,
+    setup_integration,
+    benchmark,
+    fleet_size: int,
+) -> None:
+    add_mixed_fleet(smartrent, fleet_size)
+    forward = hass.config_entries.async_forward_entry_setups
+    platform_seconds = 0.0
+
+    async def _async_timed_forward(*args: Any, **kwargs: Any) -> None:
+        nonlocal platform_seconds
+        start = time.perf_counter()
+        try:
+            await forward(*args, **kwargs)
+        finally:
+            platform_seconds += time.perf_counter() - start
+
+    with patch.object(
+        hass.config_entries, "async_forward_entry_setups", _async_timed_forward
+    ):
+        start = time.perf_counter()
+        entry = await setup_integration()
+        seconds = time.perf_counter() - start
+
+    assert entry.state is ConfigEntryState.LOADED
+    benchmark(f"setup_seconds_{fleet_size}", seconds, "s", higher_is_better=False)
+    # the async_setup_entry of every platform, including adding the entities
+    benchmark(
+        f"platform_setup_seconds_{fleet_size}",
+        platform_seconds,
+        "s",
+        higher_is_better=False,
+    )
+
+
+async def test_memory_per_entity(
+    hass: HomeAssistant, smartrent: FakeSmartRent, setup_integration, benchmark
+) -> None:
+    add_mixed_fleet(smartrent, MEMORY_FLEET_SIZE)
+    entities_before = len(hass.states.async_entity_ids())
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        entry = await setup_integration()
+        memory = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+    assert entry.state is ConfigEntryState.LOADED
+    entities = len(hass.states.async_entity_ids()) - entities_before
+    # everything setup allocated and kept, registries and states included
+    benchmark(
+        "memory_per_entity_kib", memory / entities / 1024, "KiB", higher_is_better=False
+    )
@@ -0,0 +1,124 @@
+"""Fixtures that run the integration against the fake SmartRent cloud."""
+from functools import partial
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator
+from unittest.mock import patch
+
+import pytest
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.smartrent.connection import PushConnection
+from custom_components.smartrent.const import CONF_PASSWORD, CONF_USERNAME, DOMAIN
+
+from .fake_smartrent import PASSWORD, USERNAME, FakeClient, FakeSmartRent
+
+# figures tests hand to ``report``, printed at the end of the run
+REPORT: dict[str, Any] = {}
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("smartrent benchmarks")
+    group.addoption(
+        "--benchmark",
+        action="store_true",
+        help="run the benchmarks in tests/benchmarks",
+    )
+    group.addoption(
+        "--benchmark-json",
+        metavar="PATH",
+        help="write the benchmark results to PATH",
+    )
+    group.addoption(
+        "--benchmark-baseline",
+        metavar="PATH",
+        help="fail benchmarks that got worse than in this --benchmark-json output",
+    )
+    group.addoption(
+        "--benchmark-tolerance",
+        type=float,
+        default=0.3,
+        help="share a result may be worse than the baseline (default: 0.3)",
+    )
+    group.addoption(
+        "--benchmark-fleet-sizes",
+        default="10,100,1000",
+        help="comma separated fleet sizes to benchmark setup at, up to 10000",
+    )
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations: None) -> None:
+    """Load the integration from custom_components."""
+
+
+@pytest.fixture
+async def smartrent(socket_enabled: None) -> AsyncIterator[FakeSmartRent]:
+    """Serve the SmartRent cloud from memory while the test runs.
+
+    The push websocket is served on localhost.
+    """
+    backend = FakeSmartRent()
+    await backend.async_start()
+    client = partial(FakeClient, backend=backend)
+    with patch("smartrent.api.Client", client), patch(
+        "custom_components.smartrent.config_flow.Client", client
+    ), patch(
+        "custom_components.smartrent.connection.SMARTRENT_WEBSOCKET_URI", backend.uri
+    ), patch(
+        # devices are joined all at once instead of in waves
+        "custom_components.smartrent.connection.PushConnection",
+        partial(PushConnection, wave_delay=0),
+    ):
+        yield backend
+    await backend.async_stop()
+
+
+@pytest.fixture
+def config_entry(hass: HomeAssistant) -> MockConfigEntry:
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title=USERNAME,
+        unique_id=USERNAME,
+        data={CONF_USERNAME: USERNAME, CONF_PASSWORD: PASSWORD},
+    )
+    entry.add_to_hass(hass)
+    return entry
+
+
+@pytest.fixture
+async def setup_integration(
+    hass: HomeAssistant, smartrent: FakeSmartRent, config_entry: MockConfigEntry
+) -> AsyncIterator[Callable[..., Awaitable[MockConfigEntry]]]:
+    """Return a function that sets up the entry, unloading it after the test.
+
+    Keyword arguments become the options of the entry. Whether setup worked
+    is up to the test to check through the state of the entry.
+    """
+
+    async def _async_setup(**options: Any) -> MockConfigEntry:
+        hass.config_entries.async_update_entry(config_entry, options=options)
+        await hass.config_entries.async_setup(config_entry.entry_id)
+        await hass.async_block_till_done()
+        return config_entry
+
+    yield _async_setup
+
+    if config_entry.state is ConfigEntryState.LOADED:
+        assert await hass.config_entries.async_unload(config_entry.entry_id)
+        await hass.async_block_till_done()
+
+
+@pytest.fixture
+def report() -> Iterator[dict[str, Any]]:
+    """Collect figures to print in the summary of the test run."""
+    yield REPORT
+
+
+def pytest_terminal_summary(terminalreporter: Any) -> None:
+    if not REPORT:
+        return
+
+    terminalreporter.section("SmartRent figures")
+    for name, value in REPORT.items():
+        terminalreporter.write_line(f"{name}: {value}")
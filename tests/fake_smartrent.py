@@ -0,0 +1,483 @@
+"""Offline stand-in for the SmartRent cloud.
+
+``FakeSmartRent`` keeps the devices of one account in memory. ``FakeClient``
+serves the REST calls of ``smartrent.Client`` from it, and a Phoenix
+websocket server on localhost delivers push updates, so the integration,
+``smartrent.api.API`` and the smartrent device classes run unchanged against
+it. Latency and failures can be injected into requests, commands and the
+websocket.
+"""
+import asyncio
+import itertools
+import json
+import random
+import time
+from collections import Counter, deque
+from http import HTTPStatus
+from typing import Any, Optional
+
+from aiohttp import ClientConnectionError
+from smartrent import Client
+from smartrent.utils import InvalidAuthError
+from websockets.asyncio.server import Server, ServerConnection, serve
+from websockets.exceptions import ConnectionClosed
+
+USERNAME = "tenant@example.com"
+PASSWORD = "hunter2"
+
+EVENT_TYPE = "attribute_state"
+
+
+class InjectedFailure(ClientConnectionError):
+    """A request or command failed on purpose."""
+
+
+class InjectedThrottling(InjectedFailure):
+    """A command was refused for going over the rate limit."""
+
+    status = HTTPStatus.TOO_MANY_REQUESTS
+
+
+class FakeSmartRent:
+    """One SmartRent account with its devices, reachable without a network.
+
+    ``latency`` delays every request and command, ``failure_rate`` makes
+    that share of them fail at random. Commands of single devices can be
+    slowed down through ``device_latency``, fail for good through
+    ``failing_devices`` or fail a number of times through ``flaky_devices``.
+    The next device list fetches fail while ``failing_fetches`` is above
+    zero. With ``rate_limit`` set, commands beyond that many per second are
+    refused with a 429. Requests are only served for access tokens the fake
+    handed out and did not revoke.
+    """
+
+    def __init__(
+        self, *, latency: float = 0.0, failure_rate: float = 0.0, seed: int = 0
+    ) -> None:
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+
+        self.devices: dict[int, dict[str, Any]] = {}
+        self._ids = itertools.count(1000)
+
+        self.failing_devices: set[int] = set()
+        self.flaky_devices: dict[int, int] = {}
+        self.failing_fetches = 0
+        # extra seconds the commands of single devices take
+        self.device_latency: dict[int, float] = {}
+        # commands are echoed as push events, like SmartRent does
+        self.echo_commands = True
+        # commands accepted per second, None for no limit
+        self.rate_limit: Optional[float] = None
+        self._accepted: deque[float] = deque()
+
+        # (device id, attribute, value) of every command that went through
+        self.commands: list[tuple[int, str, str]] = []
+        self.requests: Counter[str] = Counter()
+        self.access_tokens: set[str] = set()
+        self._token_ids = itertools.count(1)
+        self.commands_in_flight = 0
+        self.max_commands_in_flight = 0
+
+        # websocket server
+        self.uri = ""
+        # handshakes are refused with 503 while False
+        self.accepting = True
+        # joins and heartbeats go unanswered while False
+        self.replying = True
+        # the next joins are refused as unauthorized, like for a revoked token
+        self.unauthorized_joins = 0
+        self.connects = 0
+        self._server: Optional[Server] = None
+        self._connections: dict[ServerConnection, set[int]] = {}
+
+    # devices
+
+    def add_device(
+        self,
+        device_type: str,
+        attributes: dict[str, Any],
+        name: Optional[str] = None,
+        battery_level: Optional[int] = None,
+    ) -> int:
+        """Add a device with the given attribute states, returning its id."""
+        device_id = next(self._ids)
+        self.devices[device_id] = {
+            "id": device_id,
+            "name": name or f"{device_type} {device_id}",
+            "type": device_type,
+            "online": True,
+            "battery_powered": battery_level is not None,
+            "battery_level": battery_level,
+            "attributes": [
+                {"name": attr, "state": str(state)}
+                for attr, state in attributes.items()
+            ],
+        }
+        return device_id
+
+    def add_lock(self, locked: bool = True, name: Optional[str] = None) -> int:
+        return self.add_device(
+            "entry_control",
+            {"locked": str(locked).lower(), "notifications": "Locked by keypad"},
+            name,
+            battery_level=80,
+        )
+
+    def add_thermostat(self, name: Optional[str] = None) -> int:
+        return self.add_device(
+            "thermostat",
+            {
+                "mode": "cool",
+                "fan_mode": "auto",
+                "operating_state": "cooling",
+                "current_temp": 74,
+                "cooling_setpoint": 72,
+                "heating_setpoint": 68,
+                "current_humidity": 40,
+            },
+            name,
+        )
+
+    def add_binary_switch(self, name: Optional[str] = None) -> int:
+        return self.add_device("switch_binary", {"on": "false"}, name)
+
+    def add_multilevel_switch(self, name: Optional[str] = None) -> int:
+        return self.add_device("switch_multilevel", {"level": 0}, name)
+
+    def add_leak_sensor(self, name: Optional[str] = None) -> int:
+        return self.add_device(
+            "sensor_notification", {"leak": "false"}, name, battery_level=90
+        )
+
+    def add_motion_sensor(self, name: Optional[str] = None) -> int:
+        return self.add_device(
+            "sensor_notification", {"motion_binary": "false"}, name, battery_level=90
+        )
+
+    def add_fleet(
+        self,
+        locks: int = 0,
+        thermostats: int = 0,
+        binary_switches: int = 0,
+        multilevel_switches: int = 0,
+        leak_sensors: int = 0,
+        motion_sensors: int = 0,
+    ) -> list[int]:
+        """Add many devices at once, returning their ids."""
+        return (
+            [self.add_lock() for _ in range(locks)]
+            + [self.add_thermostat() for _ in range(thermostats)]
+            + [self.add_binary_switch() for _ in range(binary_switches)]
+            + [self.add_multilevel_switch() for _ in range(multilevel_switches)]
+            + [self.add_leak_sensor() for _ in range(leak_sensors)]
+            + [self.add_motion_sensor() for _ in range(motion_sensors)]
+        )
+
+    def remove_device(self, device_id: int) -> None:
+        del self.devices[device_id]
+
+    def get_attribute(self, device_id: int, name: str) -> Optional[str]:
+        for attr in self.devices[device_id]["attributes"]:
+            if attr["name"] == name:
+                return attr["state"]
+        return None
+
+    def set_attribute(self, device_id: int, name: str, value: Any) -> None:
+        """Change an attribute without pushing an event, as if it was missed."""
+        for attr in self.devices[device_id]["attributes"]:
+            if attr["name"] == name:
+                attr["state"] = str(value)
+                return
+        self.devices[device_id]["attributes"].append(
+            {"name": name, "state": str(value)}
+        )
+
+    def random_event(self, device_id: int) -> tuple[str, str]:
+        """Return a change of an attribute that fits the type of a device."""
+        device_type = self.devices[device_id]["type"]
+        if device_type == "entry_control":
+            name = "locked"
+        elif device_type == "thermostat":
+            name = "current_temp"
+        elif device_type == "switch_binary":
+            name = "on"
+        elif device_type == "switch_multilevel":
+            name = "level"
+        elif self.get_attribute(device_id, "leak") is not None:
+            name = "leak"
+        else:
+            name = "motion_binary"
+
+        current = self.get_attribute(device_id, name)
+        if current in ("true", "false"):
+            return name, "false" if current == "true" else "true"
+        low, high = (0, 100) if name == "level" else (60, 85)
+        value = str(self.random.randint(low, high - 1))
+        # never repeat the current value
+        return name, str(high) if value == current else value
+
+    # rest api, called through FakeClient
+
+    async def _async_request(self, kind: str) -> None:
+        self.requests[kind] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.failure_rate and self.random.random() < self.failure_rate:
+            raise InjectedFailure(f"injected {kind} failure")
+
+    def login(self, email: str, password: str) -> dict[str, Any]:
+        self.requests["sessions"] += 1
+        if (email, password) != (USERNAME, PASSWORD):
+            return {"errors": [{"code": "unauthorized"}]}
+        return self._tokens()
+
+    def refresh(self) -> dict[str, Any]:
+        self.requests["tokens"] += 1
+        return self._tokens()
+
+    def _tokens(self) -> dict[str, Any]:
+        token_id = next(self._token_ids)
+        self.access_tokens.add(f"access-{token_id}")
+        return {
+            "access_token": f"access-{token_id}",
+            "refresh_token": f"refresh-{token_id}",
+            "expires": int(time.time()) + 3600,
+        }
+
+    def issue_tokens(self) -> dict[str, Any]:
+        """Return valid tokens, as an earlier session would have stored them."""
+        return self._tokens()
+
+    def revoke_tokens(self) -> None:
+        """Reject every access token handed out so far, expired or not."""
+        self.access_tokens.clear()
+
+    def _check_token(self, token: Optional[str]) -> None:
+        if token not in self.access_tokens:
+            self.requests["rejected"] += 1
+            raise InvalidAuthError([{"code": "unauthorized"}])
+
+    async def async_get_devices_data(
+        self, token: Optional[str]
+    ) -> list[dict[str, Any]]:
+        await self._async_request("devices")
+        self._check_token(token)
+        if self.failing_fetches:
+            self.failing_fetches -= 1
+            raise InjectedFailure("injected devices failure")
+        return [self._copy(data) for data in self.devices.values()]
+
+    async def async_get_device_data(
+        self, token: Optional[str], device_id: int
+    ) -> dict[str, Any]:
+        await self._async_request("device")
+        self._check_token(token)
+        return self._copy(self.devices[device_id])
+
+    @staticmethod
+    def _copy(data: dict[str, Any]) -> dict[str, Any]:
+        return {**data, "attributes": [dict(attr) for attr in data["attributes"]]}
+
+    async def async_command(self, device_id: int, name: str, value: str) -> None:
+        """Apply a command, failing it if the device is set up to fail."""
+        self.commands_in_flight += 1
+        self.max_commands_in_flight = max(
+            self.max_commands_in_flight, self.commands_in_flight
+        )
+        try:
+            await self._async_request("command")
+            if self._over_rate_limit():
+                self.requests["throttled"] += 1
+                raise InjectedThrottling("too many commands")
+            if delay := self.device_latency.get(device_id):
+                await asyncio.sleep(delay)
+            if device_id in self.failing_devices:
+                raise InjectedFailure(f"device {device_id} is failing")
+            if self.flaky_devices.get(device_id):
+                self.flaky_devices[device_id] -= 1
+                raise InjectedFailure(f"device {device_id} is flaky")
+        finally:
+            self.commands_in_flight -= 1
+
+        self.commands.append((device_id, name, value))
+        self.set_attribute(device_id, name, value)
+        if self.echo_commands:
+            await self.async_push(device_id, name, value)
+
+    def _over_rate_limit(self) -> bool:
+        if self.rate_limit is None:
+            return False
+
+        now = time.monotonic()
+        while self._accepted and self._accepted[0] <= now - 1:
+            self._accepted.popleft()
+        if len(self._accepted) >= self.rate_limit:
+            return True
+        self._accepted.append(now)
+        return False
+
+    def commands_for(self, device_id: int, name: Optional[str] = None) -> list[str]:
+        """Return the values sent to a device, optionally for one attribute."""
+        return [
+            value
+            for command_device, command_name, value in self.commands
+            if command_device == device_id and name in (None, command_name)
+        ]
+
+    # websocket
+
+    async def async_start(self) -> None:
+        """Start the websocket server on a free localhost port."""
+        self._server = await serve(
+            self._async_handle, "127.0.0.1", 0, process_request=self._process_request
+        )
+        port = next(iter(self._server.sockets)).getsockname()[1]
+        self.uri = f"ws://127.0.0.1:{port}/socket/websocket?token={{}}&vsn=2.0.0"
+
+    async def async_stop(self) -> None:
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def _process_request(self, connection: ServerConnection, request: Any) -> Any:
+        if not self.accepting:
+            return connection.respond(HTTPStatus.SERVICE_UNAVAILABLE, "down\n")
+        return None
+
+    async def _async_handle(self, connection: ServerConnection) -> None:
+        self.connects += 1
+        topics = self._connections[connection] = set()
+        try:
+            async for message in connection:
+                join_ref, ref, topic, event, _ = json.loads(message)
+                if not self.replying:
+                    continue
+                if event == "phx_join" and self.unauthorized_joins:
+                    self.unauthorized_joins -= 1
+                    reply = {"status": "error", "response": {"reason": "unauthorized"}}
+                    await connection.send(
+                        json.dumps([join_ref, ref, topic, "phx_reply", reply])
+                    )
+                    continue
+                if event == "phx_join":
+                    topics.add(int(topic.split(":")[-1]))
+                elif event == "phx_leave":
+                    topics.discard(int(topic.split(":")[-1]))
+                elif event != "heartbeat":
+                    continue
+                await connection.send(
+                    json.dumps([join_ref, ref, topic, "phx_reply", {"status": "ok"}])
+                )
+        except ConnectionClosed:
+            pass
+        finally:
+            self._connections.pop(connection, None)
+
+    def is_joined(self, device_id: int) -> bool:
+        return any(device_id in topics for topics in self._connections.values())
+
+    @property
+    def open_connections(self) -> int:
+        """Return the number of websocket connections currently open."""
+        return len(self._connections)
+
+    @property
+    def joined(self) -> int:
+        """Return the number of device topics joined on all connections."""
+        return sum(len(topics) for topics in self._connections.values())
+
+    async def async_push(self, device_id: int, name: str, value: Any) -> None:
+        """Change an attribute and push the event to everyone who joined it."""
+        self.set_attribute(device_id, name, value)
+        frame = json.dumps(
+            [
+                None,
+                None,
+                f"devices:{device_id}",
+                EVENT_TYPE,
+                {"type": EVENT_TYPE, "name": name, "last_read_state": str(value)},
+            ]
+        )
+        for connection, topics in list(self._connections.items()):
+            if device_id in topics:
+                try:
+                    await connection.send(frame)
+                except ConnectionClosed:
+                    pass
+
+    async def async_stream_events(
+        self,
+        count: int,
+        rate: Optional[float] = None,
+        device_ids: Optional[list[int]] = None,
+    ) -> None:
+        """Push count random events across the fleet or the given devices.
+
+        Events are paced to rate per second, or pushed as fast as the
+        websocket takes them.
+        """
+        loop = asyncio.get_running_loop()
+        device_ids = device_ids or list(self.devices)
+        start = loop.time()
+        for index in range(count):
+            device_id = self.random.choice(device_ids)
+            await self.async_push(device_id, *self.random_event(device_id))
+            if rate:
+                await asyncio.sleep(max(start + (index + 1) / rate - loop.time(), 0))
+
+    async def async_close_channel(self, device_id: int) -> None:
+        """Close the topic of one device, as SmartRent does on channel errors."""
+        topic = f"devices:{device_id}"
+        for connection, topics in list(self._connections.items()):
+            if device_id in topics:
+                topics.discard(device_id)
+                await connection.send(json.dumps([None, None, topic, "phx_close", {}]))
+
+    async def async_drop(self) -> None:
+        """Drop every open connection, as a cloud blip would."""
+        for connection in list(self._connections):
+            await connection.close(1011, "dropped on purpose")
+
+
+class FakeClient(Client):
+    """``smartrent.Client`` whose http and command calls go to FakeSmartRent.
+
+    Token handling, retries and the device classes are the library's own.
+    """
+
+    def __init__(
+        self,
+        email: str,
+        password: str,
+        aiohttp_session: Any = None,
+        tfa_token: Optional[str] = None,
+        *,
+        backend: FakeSmartRent,
+    ) -> None:
+        super().__init__(email, password, aiohttp_session, tfa_token)
+        self.backend = backend
+
+    async def _async_refresh_tokens_via_email(self) -> dict:
+        return self.backend.login(self._email, self._password)
+
+    async def _async_refresh_tokens_via_refresh_token(self) -> dict:
+        return self.backend.refresh()
+
+    async def _async_refresh_tokens_via_tfa(
+        self, tfa_api_token: str, tfa_token: str
+    ) -> dict:
+        return self.backend.login(self._email, self._password)
+
+    async def _async_get_devices_data(self) -> list[dict]:
+        return await self.backend.async_get_devices_data(self._token)
+
+    async def _async_get_device_data(self, id: int) -> dict[str, Any]:
+        return await self.backend.async_get_device_data(self._token, id)
+
+    async def _async_send_command(
+        self, device: Any, attribute_name: str, value: str
+    ) -> None:
+        await self.backend.async_command(device._device_id, attribute_name, value)
@@ -0,0 +1,84 @@
+"""Tests for the lock activity log."""
+from typing import Any
+
+from homeassistant.core import Event, HomeAssistant
+
+from custom_components.smartrent.activity import EVENT_LOCK_ACTIVITY
+from custom_components.smartrent.const import CONF_PERSIST_LOCK_ACTIVITY, DOMAIN
+from custom_components.smartrent.models import SmartRentData
+
+from . import async_wait_for, async_wait_subscribed
+from .fake_smartrent import FakeSmartRent
+
+KEYPAD = "Unlocked by keypad ALARM_TYPE_19 ALARM_LEVEL_3"
+MANUAL = "Locked manually ALARM_TYPE_21"
+
+
+def _key(entry_id: str, device_id: int) -> str:
+    return f"{DOMAIN}.{entry_id}.lock_activity.{device_id}"
+
+
+async def test_repeated_notifications_are_recorded(
+    hass: HomeAssistant, smartrent: FakeSmartRent, setup_integration
+) -> None:
+    lock = smartrent.add_lock()
+    entry = await setup_integration()
+    data: SmartRentData = hass.data[DOMAIN][entry.entry_id]
+    await async_wait_subscribed(hass, entry)
+    fired: list[Event] = []
+    hass.bus.async_listen(EVENT_LOCK_ACTIVITY, fired.append)
+
+    # the same code entered twice
+    await smartrent.async_push(lock, "notifications", KEYPAD)
+    await smartrent.async_push(lock, "notifications", KEYPAD)
+    await async_wait_for(lambda: len(data.activity.get(lock)) == 2)
+
+    # changed while nothing was pushed, and unchanged after that
+    smartrent.set_attribute(lock, "notifications", MANUAL)
+    await data.hub.async_resync()
+    await data.hub.async_resync()
+    await hass.async_block_till_done()
+
+    history = data.activity.get(lock)
+    assert [activity["raw"] for activity in history] == [MANUAL, KEYPAD, KEYPAD]
+    assert history[1]["user"] == 3
+    assert history[1]["method"] == "keypad"
+    assert len(fired) == 3
+
+
+async def test_only_locks_with_new_activity_are_written(
+    hass: HomeAssistant,
+    hass_storage: dict[str, Any],
+    smartrent: FakeSmartRent,
+    setup_integration,
+) -> None:
+    busy, quiet = smartrent.add_lock(), smartrent.add_lock()
+    entry = await setup_integration(**{CONF_PERSIST_LOCK_ACTIVITY: True})
+    data: SmartRentData = hass.data[DOMAIN][entry.entry_id]
+    await async_wait_subscribed(hass, entry)
+
+    await smartrent.async_push(quiet, "notifications", MANUAL)
+    await smartrent.async_push(busy, "notifications", KEYPAD)
+    await async_wait_for(lambda: data.activity.get(busy))
+    await data.activity.async_save()
+    quiet_written = hass_storage[_key(entry.entry_id, quiet)]
+
+    await smartrent.async_push(busy, "notifications", MANUAL)
+    await async_wait_for(lambda: len(data.activity.get(busy)) == 2)
+    await data.activity.async_save()
+
+    assert len(hass_storage[_key(entry.entry_id, busy)]["data"]) == 2
+    # the same object, the quiet lock was not written again
+    assert hass_storage[_key(entry.entry_id, quiet)] is quiet_written
+    index = hass_storage[f"{DOMAIN}.{entry.entry_id}.lock_activity"]["data"]
+    assert index == {"locks": sorted([busy, quiet])}
+
+    # the stored activity is back after a restart
+    assert await hass.config_entries.async_reload(entry.entry_id)
+    await hass.async_block_till_done()
+    data = hass.data[DOMAIN][entry.entry_id]
+    assert [activity["raw"] for activity in data.activity.get(busy)] == [
+        MANUAL,
+        KEYPAD,
+    ]
+    assert len(data.activity.get(quiet)) == 1
@@ -0,0 +1,60 @@
+"""Tests for the SmartRent thermostat."""
+import asyncio
+from unittest.mock import patch
+
+from homeassistant.components.climate import (
+    ATTR_CURRENT_TEMPERATURE,
+)
+from homeassistant.components.climate import DOMAIN as CLIMATE_DOMAIN
+from homeassistant.components.climate import SERVICE_SET_TEMPERATURE
+from homeassistant.const import ATTR_ENTITY_ID, ATTR_TEMPERATURE
+from homeassistant.core import HomeAssistant
+from homeassistant.util.unit_system import US_CUSTOMARY_SYSTEM
+
+from . import async_wait_for, entity_id_of
+from .fake_smartrent import FakeSmartRent
+
+# the setpoints of a slider dragged from 80 down to 61 in one degree steps
+DRAG = [float(temperature) for temperature in range(80, 60, -1)]
+
+
+async def test_slider_drag_sends_one_setpoint(
+    hass: HomeAssistant, smartrent: FakeSmartRent, setup_integration
+) -> None:
+    # the thermostat works in fahrenheit
+    hass.config.units = US_CUSTOMARY_SYSTEM
+    thermostat = smartrent.add_thermostat()
+    await setup_integration()
+    entity_id = entity_id_of(hass, "climate", thermostat)
+    # keeps the command in flight long enough to look at it
+    smartrent.latency = 0.2
+
+    with patch("custom_components.smartrent.climate.COMMAND_DELAY", 0.05):
+        for temperature in DRAG:
+            await hass.services.async_call(
+                CLIMATE_DOMAIN,
+                SERVICE_SET_TEMPERATURE,
+                {ATTR_ENTITY_ID: entity_id, ATTR_TEMPERATURE: temperature},
+            )
+            # each step is shown right away
+            await async_wait_for(
+                lambda: hass.states.get(entity_id).attributes[ATTR_TEMPERATURE]
+                == temperature
+            )
+            await asyncio.sleep(0.01)
+
+        await async_wait_for(lambda: smartrent.requests["command"] == 1)
+
+    # an event for another field arrives while the setpoint is being sent
+    await smartrent.async_push(thermostat, "current_temp", 70)
+    await async_wait_for(
+        lambda: hass.states.get(entity_id).attributes[ATTR_CURRENT_TEMPERATURE] == 70
+    )
+    assert hass.states.get(entity_id).attributes[ATTR_TEMPERATURE] == DRAG[-1]
+
+    await async_wait_for(lambda: smartrent.commands)
+    await hass.async_block_till_done()
+
+    assert smartrent.commands_for(thermostat) == [str(DRAG[-1])]
+    assert smartrent.requests["command"] == 1
+    assert hass.states.get(entity_id).attributes[ATTR_TEMPERATURE] == DRAG[-1]
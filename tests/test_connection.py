@@ -0,0 +1,133 @@
+"""Tests for the supervised push connection."""
+from typing import Iterator
+from unittest.mock import patch
+
+import pytest
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import STATE_LOCKED, STATE_ON, STATE_UNAVAILABLE
+from homeassistant.core import HomeAssistant
+
+from custom_components.smartrent.connection import PushConnection
+from custom_components.smartrent.const import DOMAIN
+from custom_components.smartrent.sensor import NOTIFICATION
+
+from . import async_wait_for, async_wait_subscribed, entity_id_of
+from .fake_smartrent import FakeSmartRent
+
+
+@pytest.fixture(autouse=True)
+def fast_connection() -> Iterator[None]:
+    """Reconnect, rejoin and detect stalls within a fraction of a second."""
+    with patch(
+        "custom_components.smartrent.connection.MIN_BACKOFF_SECONDS", 0.01
+    ), patch("custom_components.smartrent.connection.REJOIN_DELAY", 0.1), patch(
+        "custom_components.smartrent.connection.HEARTBEAT_INTERVAL", 0.2
+    ):
+        yield
+
+
+def _state(hass: HomeAssistant, entity_id: str) -> str:
+    return hass.states.get(entity_id).state
+
+
+def _connection(hass: HomeAssistant, entry: ConfigEntry) -> PushConnection:
+    connection = hass.data[DOMAIN][entry.entry_id].hub.connection
+    assert connection is not None
+    return connection
+
+
+async def test_dropped_connection_reconnects_and_resyncs(
+    hass: HomeAssistant, smartrent: FakeSmartRent, setup_integration
+) -> None:
+    lock = smartrent.add_lock()
+    switch = smartrent.add_binary_switch()
+    entry = await setup_integration()
+    connection = _connection(hass, entry)
+    lock_id = entity_id_of(hass, "lock", lock)
+    switch_id = entity_id_of(hass, "switch", switch)
+    await async_wait_subscribed(hass, entry)
+    fetches = dict(smartrent.requests)
+
+    # the cloud goes away, and an event is missed while it is gone
+    smartrent.accepting = False
+    await smartrent.async_drop()
+    await async_wait_for(lambda: _state(hass, lock_id) == STATE_UNAVAILABLE)
+    assert _state(hass, switch_id) == STATE_UNAVAILABLE
+    smartrent.set_attribute(switch, "on", "true")
+
+    smartrent.accepting = True
+    await async_wait_for(lambda: _state(hass, switch_id) == STATE_ON)
+
+    assert _state(hass, lock_id) == STATE_LOCKED
+    assert connection.connects == 2
+    # one bulk resync instead of a fetch per device
+    assert smartrent.requests["devices"] == fetches["devices"] + 1
+    assert smartrent.requests["device"] == fetches["device"]
+
+
+async def test_stalled_stream_reconnects(
+    hass: HomeAssistant, smartrent: FakeSmartRent, setup_integration
+) -> None:
+    lock = smartrent.add_lock()
+    entry = await setup_integration()
+    connection = _connection(hass, entry)
+    lock_id = entity_id_of(hass, "lock", lock)
+    await async_wait_subscribed(hass, entry)
+
+    # the socket stays open, but nothing comes back anymore
+    smartrent.replying = False
+    await async_wait_for(lambda: connection.disconnects == 1)
+    assert _state(hass, lock_id) == STATE_UNAVAILABLE
+
+    smartrent.replying = True
+    await async_wait_for(lambda: _state(hass, lock_id) == STATE_LOCKED)
+    assert connection.connects >= 2
+
+
+async def test_closed_channel_only_affects_its_device(
+    hass: HomeAssistant, smartrent: FakeSmartRent, setup_integration
+) -> None:
+    lock = smartrent.add_lock()
+    switch = smartrent.add_binary_switch()
+    entry = await setup_integration()
+    connection = _connection(hass, entry)
+    lock_id = entity_id_of(hass, "lock", lock)
+    switch_id = entity_id_of(hass, "switch", switch)
+    await async_wait_subscribed(hass, entry)
+
+    await smartrent.async_close_channel(lock)
+    await async_wait_for(lambda: _state(hass, lock_id) == STATE_UNAVAILABLE)
+    assert _state(hass, switch_id) != STATE_UNAVAILABLE
+
+    # joined again after the rejoin delay, on the same connection
+    await async_wait_for(lambda: _state(hass, lock_id) == STATE_LOCKED)
+    assert smartrent.is_joined(lock)
+    assert connection.connects == 1
+
+
+async def test_unauthorized_join_reconnects(
+    hass: HomeAssistant, smartrent: FakeSmartRent, setup_integration
+) -> None:
+    lock = smartrent.add_lock()
+    smartrent.unauthorized_joins = 1
+    entry = await setup_integration()
+    connection = _connection(hass, entry)
+    lock_id = entity_id_of(hass, "lock", lock)
+
+    await async_wait_for(lambda: _state(hass, lock_id) == STATE_LOCKED)
+    assert connection.connects == 2
+
+
+async def test_event_mentioning_unauthorized_keeps_the_connection(
+    hass: HomeAssistant, smartrent: FakeSmartRent, setup_integration
+) -> None:
+    lock = smartrent.add_lock()
+    entry = await setup_integration()
+    connection = _connection(hass, entry)
+    sensor_id = entity_id_of(hass, "sensor", f"{lock}{NOTIFICATION.unique_id_suffix}")
+    await async_wait_subscribed(hass, entry)
+
+    await smartrent.async_push(lock, "notifications", "Unauthorized code entered")
+    await async_wait_for(lambda: _state(hass, sensor_id) == "Unauthorized code entered")
+    assert connection.connects == 1
+    assert connection.disconnects == 0
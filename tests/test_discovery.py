@@ -0,0 +1,88 @@
+"""Tests for discovering devices added to or removed from SmartRent."""
+from unittest.mock import patch
+
+from homeassistant.const import STATE_LOCKED, STATE_ON, STATE_UNLOCKED
+from homeassistant.core import Event, HomeAssistant
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.smartrent import async_sync_devices
+from custom_components.smartrent.const import DOMAIN
+from custom_components.smartrent.models import SmartRentData
+
+from . import async_wait_for, async_wait_subscribed, entity_id_of
+from .fake_smartrent import FakeSmartRent
+
+
+async def test_entities_follow_the_device_list(
+    hass: HomeAssistant, smartrent: FakeSmartRent, setup_integration
+) -> None:
+    lock = smartrent.add_lock()
+    switch = smartrent.add_binary_switch()
+    entry = await setup_integration()
+    data: SmartRentData = hass.data[DOMAIN][entry.entry_id]
+    entity_registry = er.async_get(hass)
+    lock_id = entity_id_of(hass, "lock", lock)
+    switch_id = entity_id_of(hass, "switch", switch)
+    await async_wait_subscribed(hass, entry)
+
+    # the switch is taken out and a second lock installed
+    smartrent.remove_device(switch)
+    new_lock = smartrent.add_lock(locked=False)
+    await async_sync_devices(hass, entry, data)
+    await hass.async_block_till_done()
+
+    assert hass.states.get(switch_id) is None
+    assert entity_registry.async_get(switch_id) is None
+    assert dr.async_get(hass).async_get_device(identifiers={("id", switch)}) is None
+    new_lock_id = entity_id_of(hass, "lock", new_lock)
+    assert hass.states.get(lock_id).state == STATE_LOCKED
+
+    # the new lock is subscribed like the ones found at setup
+    await async_wait_subscribed(hass, entry)
+    assert smartrent.is_joined(new_lock)
+    assert not smartrent.is_joined(switch)
+    await async_wait_for(lambda: hass.states.get(new_lock_id).state == STATE_UNLOCKED)
+    await smartrent.async_push(new_lock, "locked", "true")
+    await async_wait_for(lambda: hass.states.get(new_lock_id).state == STATE_LOCKED)
+
+    # and a later change of the list is picked up as well
+    new_switch = smartrent.add_binary_switch()
+    smartrent.set_attribute(new_switch, "on", "true")
+    await async_sync_devices(hass, entry, data)
+    await hass.async_block_till_done()
+
+    await async_wait_subscribed(hass, entry)
+    new_switch_id = entity_id_of(hass, "switch", new_switch)
+    await async_wait_for(lambda: hass.states.get(new_switch_id).state == STATE_ON)
+    assert len(data.hub.devices) == 3
+
+
+async def test_unchanged_device_list_writes_no_registries(
+    hass: HomeAssistant, smartrent: FakeSmartRent, setup_integration
+) -> None:
+    smartrent.add_fleet(locks=2, thermostats=1, binary_switches=1, leak_sensors=1)
+    entry = await setup_integration()
+    data: SmartRentData = hass.data[DOMAIN][entry.entry_id]
+    device_registry = dr.async_get(hass)
+    entity_registry = er.async_get(hass)
+
+    updates: list[Event] = []
+
+    def _record(event: Event) -> None:
+        updates.append(event)
+
+    hass.bus.async_listen(dr.EVENT_DEVICE_REGISTRY_UPDATED, _record)
+    hass.bus.async_listen(er.EVENT_ENTITY_REGISTRY_UPDATED, _record)
+    with patch.object(
+        device_registry, "async_schedule_save"
+    ) as device_saves, patch.object(
+        entity_registry, "async_schedule_save"
+    ) as entity_saves:
+        await async_sync_devices(hass, entry, data)
+        await hass.async_block_till_done()
+
+    assert updates == []
+    device_saves.assert_not_called()
+    entity_saves.assert_not_called()
+    assert smartrent.requests["devices"] == 2
@@ -0,0 +1,111 @@
+"""Tests for the fan-out of device updates by the hub."""
+import time
+
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.smartrent.const import DOMAIN
+from custom_components.smartrent.hub import SmartRentHub
+
+from . import entity_id_of
+from .fake_smartrent import EVENT_TYPE, FakeSmartRent
+
+EVENTS = 10_000
+# listeners added on top of the entities of the lock
+EXTRA_LISTENERS = 20
+# generous, a dispatch takes tens of microseconds
+MAX_SECONDS_PER_EVENT = 0.002
+
+
+def _event(locked: bool) -> dict:
+    return {
+        "type": EVENT_TYPE,
+        "name": "locked",
+        "last_read_state": str(locked).lower(),
+    }
+
+
+async def test_fan_out_reaches_every_listener(
+    hass: HomeAssistant, smartrent: FakeSmartRent, setup_integration, report
+) -> None:
+    lock_id = smartrent.add_lock()
+    entry = await setup_integration()
+    hub: SmartRentHub = hass.data[DOMAIN][entry.entry_id].hub
+    device = hub.get_device(lock_id)
+    assert device is not None
+
+    calls = {"locked": [0] * EXTRA_LISTENERS, "battery_level": [0] * EXTRA_LISTENERS}
+    for field, counts in calls.items():
+        for index in range(EXTRA_LISTENERS):
+
+            @callback
+            def _async_count(counts: list[int] = counts, index: int = index) -> None:
+                counts[index] += 1
+
+            hub.async_add_listener(lock_id, (field,), _async_count)
+
+    entity_ids = {
+        entity.unique_id: entity.entity_id
+        for entity in er.async_entries_for_config_entry(
+            er.async_get(hass), entry.entry_id
+        )
+    }
+    lock_entity = entity_id_of(hass, "lock", lock_id)
+    changes = dict.fromkeys(entity_ids.values(), 0)
+
+    @callback
+    def _async_state_changed(event: Event) -> None:
+        changes[event.data["entity_id"]] += 1
+
+    unsub = hass.bus.async_listen(EVENT_STATE_CHANGED, _async_state_changed)
+    suppressed = hub.suppressed_writes
+
+    chunks = []
+    for chunk in range(10):
+        start = time.perf_counter()
+        for index in range(EVENTS // 10):
+            # every event flips the lock, which starts out locked
+            await device._update(_event(index % 2 == 1))
+        chunks.append((time.perf_counter() - start) / (EVENTS // 10))
+    await hass.async_block_till_done()
+    unsub()
+
+    assert calls["locked"] == [EVENTS] * EXTRA_LISTENERS
+    assert calls["battery_level"] == [0] * EXTRA_LISTENERS
+    assert changes[lock_entity] == EVENTS
+    for unique_id, entity_id in entity_ids.items():
+        # the lock and its locked sensor change, the other sensors do not
+        expected = EVENTS if unique_id == lock_id or "locked" in entity_id else 0
+        assert changes[entity_id] == expected, entity_id
+    # the battery level listeners, the battery and notification sensors and
+    # the lock activity log, which only follows notifications
+    assert hub.suppressed_writes - suppressed == EVENTS * (EXTRA_LISTENERS + 3)
+
+    per_event = sum(chunks) / len(chunks)
+    assert per_event < MAX_SECONDS_PER_EVENT
+    # the cost of an event does not grow with the events dispatched before
+    assert chunks[-1] < chunks[0] * 3
+    report["fan-out microseconds per event"] = round(per_event * 1e6, 1)
+
+
+async def test_removed_entity_stops_listening(
+    hass: HomeAssistant, smartrent: FakeSmartRent, setup_integration
+) -> None:
+    lock_id = smartrent.add_lock()
+    entry = await setup_integration()
+    hub: SmartRentHub = hass.data[DOMAIN][entry.entry_id].hub
+    device = hub.get_device(lock_id)
+    assert device is not None
+
+    dispatched = hub.dispatched_writes
+    await device._update(_event(False))
+    # the lock and its locked sensor
+    assert hub.dispatched_writes - dispatched == 2
+
+    er.async_get(hass).async_remove(entity_id_of(hass, "lock", lock_id))
+    await hass.async_block_till_done()
+
+    dispatched = hub.dispatched_writes
+    await device._update(_event(True))
+    assert hub.dispatched_writes - dispatched == 1
@@ -0,0 +1,136 @@
+"""Tests for setting up and unloading SmartRent entries."""
+from typing import Any
+from unittest.mock import patch
+
+from aiohttp import ClientSession
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import STATE_LOCKED, STATE_OFF
+from homeassistant.core import HomeAssistant
+
+from custom_components.smartrent.const import DOMAIN
+from custom_components.smartrent.hub import SmartRentHub
+from custom_components.smartrent.session import create_session
+
+from . import async_wait_for, entity_id_of
+from .fake_smartrent import FakeSmartRent
+
+
+def _store_tokens(
+    hass_storage: dict[str, Any], entry_id: str, tokens: dict[str, Any]
+) -> str:
+    """Store tokens of an earlier run of an entry, returning the storage key."""
+    key = f"{DOMAIN}.{entry_id}.tokens"
+    hass_storage[key] = {"version": 1, "minor_version": 1, "key": key, "data": tokens}
+    return key
+
+
+async def test_setup_and_unload(
+    hass: HomeAssistant, smartrent: FakeSmartRent, setup_integration
+) -> None:
+    lock = smartrent.add_lock()
+    switch = smartrent.add_binary_switch()
+    smartrent.add_thermostat()
+    smartrent.add_multilevel_switch()
+    smartrent.add_leak_sensor()
+    smartrent.add_motion_sensor()
+
+    entry = await setup_integration()
+
+    assert entry.state is ConfigEntryState.LOADED
+    assert hass.states.get(entity_id_of(hass, "lock", lock)).state == STATE_LOCKED
+    assert hass.states.get(entity_id_of(hass, "switch", switch)).state == STATE_OFF
+    assert smartrent.joined == 6
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert entry.state is ConfigEntryState.NOT_LOADED
+    assert entry.entry_id not in hass.data[DOMAIN]
+
+
+async def test_setup_retries_while_smartrent_is_down(
+    smartrent: FakeSmartRent, setup_integration
+) -> None:
+    smartrent.add_lock()
+    smartrent.failing_fetches = 1
+
+    entry = await setup_integration()
+
+    assert entry.state is ConfigEntryState.SETUP_RETRY
+
+
+async def test_setup_asks_for_reauth_on_rejected_credentials(
+    hass: HomeAssistant, smartrent: FakeSmartRent, config_entry, setup_integration
+) -> None:
+    hass.config_entries.async_update_entry(
+        config_entry, data={**config_entry.data, "password": "wrong"}
+    )
+
+    entry = await setup_integration()
+
+    assert entry.state is ConfigEntryState.SETUP_ERROR
+    assert any(entry.async_get_active_flows(hass, {"reauth"}))
+
+
+async def test_failed_setup_releases_the_session(
+    smartrent: FakeSmartRent, setup_integration
+) -> None:
+    smartrent.add_lock()
+    sessions: list[ClientSession] = []
+
+    def _create_session() -> ClientSession:
+        sessions.append(session := create_session())
+        return session
+
+    with patch(
+        "custom_components.smartrent.create_session", _create_session
+    ), patch.object(
+        SmartRentHub, "async_wait_ready", side_effect=RuntimeError("failed late")
+    ):
+        entry = await setup_integration()
+
+    assert entry.state is ConfigEntryState.SETUP_ERROR
+    assert sessions[0].closed
+    # the push connection was stopped with the rest
+    await async_wait_for(lambda: smartrent.joined == 0)
+
+
+async def test_warm_restart_reuses_stored_tokens(
+    hass: HomeAssistant,
+    hass_storage: dict[str, Any],
+    smartrent: FakeSmartRent,
+    config_entry,
+    setup_integration,
+) -> None:
+    lock = smartrent.add_lock()
+    _store_tokens(hass_storage, config_entry.entry_id, smartrent.issue_tokens())
+
+    entry = await setup_integration()
+
+    assert entry.state is ConfigEntryState.LOADED
+    assert hass.states.get(entity_id_of(hass, "lock", lock)).state == STATE_LOCKED
+    assert smartrent.requests["sessions"] == 0
+    assert smartrent.requests["rejected"] == 0
+
+
+async def test_revoked_stored_tokens_fall_back_to_login(
+    hass: HomeAssistant,
+    hass_storage: dict[str, Any],
+    smartrent: FakeSmartRent,
+    config_entry,
+    setup_integration,
+) -> None:
+    smartrent.add_lock()
+    key = _store_tokens(hass_storage, config_entry.entry_id, smartrent.issue_tokens())
+    # revoked long before the stored tokens expire
+    smartrent.revoke_tokens()
+
+    with patch.object(config_entry, "async_start_reauth") as start_reauth:
+        entry = await setup_integration()
+
+    assert entry.state is ConfigEntryState.LOADED
+    start_reauth.assert_not_called()
+    # the client retries once with the same token on its own
+    assert smartrent.requests["rejected"] == 2
+    assert smartrent.requests["sessions"] == 1
+    assert hass_storage[key]["data"]["access_token"] in smartrent.access_tokens
@@ -0,0 +1,92 @@
+"""Tests for the SmartRent dimmer."""
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from homeassistant.components.light import ATTR_BRIGHTNESS
+from homeassistant.components.light import DOMAIN as LIGHT_DOMAIN
+from homeassistant.const import ATTR_ENTITY_ID, SERVICE_TURN_ON, STATE_OFF, STATE_ON
+from homeassistant.core import HomeAssistant
+
+from . import async_wait_for, entity_id_of
+from .fake_smartrent import FakeSmartRent, InjectedFailure
+
+# the brightness of a slider swept from dark to full in 50 steps
+SWEEP = [round(255 * step / 50) for step in range(1, 51)]
+
+
+async def test_slider_sweep_sends_one_level(
+    hass: HomeAssistant, smartrent: FakeSmartRent, setup_integration, report
+) -> None:
+    light = smartrent.add_multilevel_switch()
+    await setup_integration()
+    entity_id = entity_id_of(hass, "light", light)
+
+    # far longer than a step takes, even on a loaded machine
+    with patch("custom_components.smartrent.light.COMMAND_DELAY", 0.5):
+        for brightness in SWEEP:
+            await hass.services.async_call(
+                LIGHT_DOMAIN,
+                SERVICE_TURN_ON,
+                {ATTR_ENTITY_ID: entity_id, ATTR_BRIGHTNESS: brightness},
+            )
+            # each step is shown right away
+            await async_wait_for(
+                lambda: hass.states.get(entity_id).attributes[ATTR_BRIGHTNESS]
+                == brightness
+            )
+            await asyncio.sleep(0.01)
+
+        await async_wait_for(lambda: smartrent.commands)
+    await hass.async_block_till_done()
+
+    report[
+        "light sweep commands per events"
+    ] = f"{smartrent.requests['command']}/{len(SWEEP)}"
+    assert smartrent.commands_for(light) == ["100"]
+    assert smartrent.requests["command"] == 1
+    assert hass.states.get(entity_id).attributes[ATTR_BRIGHTNESS] == 255
+
+
+async def test_failed_level_rolls_back_at_once(
+    hass: HomeAssistant, smartrent: FakeSmartRent, setup_integration
+) -> None:
+    light = smartrent.add_multilevel_switch()
+    await setup_integration()
+    entity_id = entity_id_of(hass, "light", light)
+    smartrent.failing_devices.add(light)
+
+    with patch("custom_components.smartrent.light.COMMAND_DELAY", 0.01):
+        with pytest.raises(InjectedFailure):
+            await hass.services.async_call(
+                LIGHT_DOMAIN,
+                SERVICE_TURN_ON,
+                {ATTR_ENTITY_ID: entity_id, ATTR_BRIGHTNESS: 128},
+                blocking=True,
+            )
+
+    # without waiting for the device to confirm
+    assert hass.states.get(entity_id).state == STATE_OFF
+
+
+async def test_unconfirmed_level_rolls_back(
+    hass: HomeAssistant, smartrent: FakeSmartRent, setup_integration
+) -> None:
+    light = smartrent.add_multilevel_switch()
+    await setup_integration()
+    entity_id = entity_id_of(hass, "light", light)
+    smartrent.echo_commands = False
+
+    with patch("custom_components.smartrent.light.COMMAND_DELAY", 0.01), patch(
+        "custom_components.smartrent.light.CONFIRM_TIMEOUT", 0.05
+    ):
+        await hass.services.async_call(
+            LIGHT_DOMAIN,
+            SERVICE_TURN_ON,
+            {ATTR_ENTITY_ID: entity_id, ATTR_BRIGHTNESS: 128},
+            blocking=True,
+        )
+        assert hass.states.get(entity_id).state == STATE_ON
+        await async_wait_for(lambda: hass.states.get(entity_id).state == STATE_OFF)
+
+    assert smartrent.commands_for(light) == ["50"]
@@ -0,0 +1,146 @@
+"""Memory the entities of a large fleet take."""
+import gc
+import tracemalloc
+from contextlib import ExitStack
+from functools import partial
+from types import ModuleType
+from typing import Any
+from unittest.mock import patch
+
+from homeassistant.components.lock import LockEntityFeature
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
+
+from custom_components.smartrent import (
+    binary_sensor,
+    climate,
+    light,
+    lock,
+    sensor,
+    switch,
+)
+from custom_components.smartrent.commands import CommandQueue
+from custom_components.smartrent.const import (
+    CONFIGURATION_URL,
+    DOMAIN,
+    PROPER_NAME,
+)
+from custom_components.smartrent.hub import SmartRentHub
+from custom_components.smartrent.inventory import DeviceInventory, SmartRentDevice
+
+from .fake_smartrent import FakeSmartRent
+
+# platform module, entity class it builds, builder
+PLATFORMS: list[tuple[ModuleType, str, Any]] = [
+    (binary_sensor, "SmartrentBinarySensor", binary_sensor._build_binary_sensors),
+    (climate, "SmartrentThermostat", climate._build_thermostats),
+    (light, "SmartrentLight", light._build_lights),
+    (lock, "SmartrentLock", lock._build_locks),
+    (sensor, "SmartrentSensor", sensor._build_sensors),
+    (switch, "SmartrentBinarySwitch", switch._build_switches),
+]
+FLEET = {
+    "locks": 200,
+    "thermostats": 100,
+    "binary_switches": 100,
+    "multilevel_switches": 50,
+    "leak_sensors": 25,
+    "motion_sensors": 25,
+}
+# the entities of a device must take at most this share of what they took
+# when every entity kept its own copies of the device's data
+MAX_RATIO = 0.6
+
+
+def _keep_copies(entity: Any, hub: SmartRentHub, device: SmartRentDevice) -> None:
+    """Give an entity the per-instance copies the entities used to keep."""
+    entity._attr_unique_id = device._device_id
+    entity._attr_name = device._name
+    entity._attr_device_info = DeviceInfo(
+        identifiers={("id", device._device_id)},
+        name=str(device._name),
+        manufacturer=PROPER_NAME,
+        model=str(device.__class__.__name__),
+        entry_type=DeviceEntryType.SERVICE,
+        configuration_url=CONFIGURATION_URL,
+    )
+
+    if isinstance(entity, sensor.SmartrentSensor):
+        description = entity.entity_description
+        key = description.key
+        entity.sensor_name = key
+        entity.device_fields = (key, "online")
+        entity._get_value = getattr(device, f"get_{key}")
+        entity._attr_unique_id = str(device._device_id) + "".join(
+            [str(ord(char)) for char in key]
+        )
+        entity._attr_name = device._name + " " + key
+        entity._attr_device_class = description.device_class
+        entity._attr_state_class = description.state_class
+        entity._attr_native_unit_of_measurement = description.native_unit_of_measurement
+    elif isinstance(entity, lock.SmartrentLock):
+        entity._attr_supported_features = LockEntityFeature.OPEN
+    elif isinstance(entity, climate.SmartrentThermostat):
+        # the command queue was created up front
+        entity._command_queue()
+    elif isinstance(entity, light.SmartrentLight):
+        entity._commands = CommandQueue(
+            hub.hass,
+            light.COMMAND_DELAY,
+            {"level": partial(entity.async_send_command, device.async_set_level)},
+            entity._async_level_sent,
+        )
+
+
+def _fresh_class(entity_class: Any, old_layout: bool) -> type:
+    """Return a new subclass, so no earlier instance shaped its dict keys."""
+    namespace: dict[str, Any] = {}
+    if old_layout:
+
+        def __init__(
+            self: Any, hub: SmartRentHub, device: SmartRentDevice, *args: Any
+        ) -> None:
+            entity_class.__init__(self, hub, device, *args)
+            _keep_copies(self, hub, device)
+
+        namespace["__init__"] = __init__
+    return type(entity_class.__name__, (entity_class,), namespace)
+
+
+def _measure(hub: SmartRentHub, inventory: DeviceInventory, old_layout: bool) -> int:
+    """Return the bytes the entities of all devices hold, built from scratch."""
+    with ExitStack() as stack:
+        for module, name, _ in PLATFORMS:
+            fresh = _fresh_class(getattr(module, name), old_layout)
+            stack.enter_context(patch.object(module, name, fresh))
+
+        gc.collect()
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            entities = [
+                entity for _, _, build in PLATFORMS for entity in build(hub, inventory)
+            ]
+            used = tracemalloc.get_traced_memory()[0] - before
+        finally:
+            tracemalloc.stop()
+
+    assert len(entities) > len(hub.devices)
+    return used
+
+
+async def test_entity_memory_per_device(
+    hass: HomeAssistant, smartrent: FakeSmartRent, setup_integration, report
+) -> None:
+    smartrent.add_fleet(**FLEET)
+    entry = await setup_integration()
+    hub: SmartRentHub = hass.data[DOMAIN][entry.entry_id].hub
+    inventory = DeviceInventory(hub.devices)
+    devices = len(hub.devices)
+
+    old = _measure(hub, inventory, old_layout=True)
+    new = _measure(hub, inventory, old_layout=False)
+
+    report["entity memory per device KiB (old layout)"] = round(old / devices / 1024, 2)
+    report["entity memory per device KiB"] = round(new / devices / 1024, 2)
+    assert new <= old * MAX_RATIO
@@ -0,0 +1,142 @@
+"""Tests for polling device state instead of, or while waiting for, push."""
+from typing import Iterator
+from unittest.mock import patch
+
+import pytest
+from homeassistant.components.lock import DOMAIN as LOCK_DOMAIN
+from homeassistant.const import (
+    ATTR_ENTITY_ID,
+    SERVICE_LOCK,
+    SERVICE_UNLOCK,
+    STATE_LOCKED,
+    STATE_ON,
+    STATE_UNAVAILABLE,
+    STATE_UNLOCKED,
+)
+from homeassistant.core import HomeAssistant
+
+from custom_components.smartrent.const import (
+    CONF_UPDATE_MODE,
+    DOMAIN,
+    UPDATE_MODE_POLL,
+)
+from custom_components.smartrent.hub import SmartRentHub
+from custom_components.smartrent.poller import (
+    DEFAULT_INTERVAL,
+    MAX_INTERVAL,
+    MIN_INTERVAL,
+    SmartRentPoller,
+)
+
+from . import async_wait_for, async_wait_subscribed, entity_id_of
+from .fake_smartrent import FakeSmartRent
+
+
+@pytest.fixture(autouse=True)
+def fast_reconnects() -> Iterator[None]:
+    """Fall back to polling within a fraction of a second."""
+    with patch(
+        "custom_components.smartrent.connection.MIN_BACKOFF_SECONDS", 0.01
+    ), patch("custom_components.smartrent.connection.MAX_BACKOFF_SECONDS", 0.1):
+        yield
+
+
+def _state(hass: HomeAssistant, entity_id: str) -> str:
+    return hass.states.get(entity_id).state
+
+
+async def test_poll_mode_updates_state_without_push(
+    hass: HomeAssistant, smartrent: FakeSmartRent, setup_integration
+) -> None:
+    lock = smartrent.add_lock()
+    entry = await setup_integration(**{CONF_UPDATE_MODE: UPDATE_MODE_POLL})
+    hub: SmartRentHub = hass.data[DOMAIN][entry.entry_id].hub
+    lock_id = entity_id_of(hass, "lock", lock)
+    assert hub.polling
+    assert isinstance(hub.poller, SmartRentPoller)
+
+    assert _state(hass, lock_id) == STATE_LOCKED
+    assert smartrent.connects == 0
+
+    smartrent.set_attribute(lock, "locked", "false")
+    await hub.poller.async_refresh()
+
+    assert _state(hass, lock_id) == STATE_UNLOCKED
+    assert hub.requests[UPDATE_MODE_POLL] == 2
+
+
+async def test_poll_interval_grows_while_idle_and_resets_on_command(
+    hass: HomeAssistant, smartrent: FakeSmartRent, setup_integration
+) -> None:
+    lock = smartrent.add_lock()
+    entry = await setup_integration(**{CONF_UPDATE_MODE: UPDATE_MODE_POLL})
+    poller = hass.data[DOMAIN][entry.entry_id].hub.poller
+    assert isinstance(poller, SmartRentPoller)
+
+    # nothing changed since setup fetched the devices
+    assert poller.update_interval == DEFAULT_INTERVAL * 2
+    intervals = []
+    for _ in range(4):
+        await poller.async_refresh()
+        intervals.append(poller.update_interval)
+    assert intervals == [
+        DEFAULT_INTERVAL * 4,
+        DEFAULT_INTERVAL * 8,
+        MAX_INTERVAL,
+        MAX_INTERVAL,
+    ]
+
+    smartrent.set_attribute(lock, "locked", "false")
+    await poller.async_refresh()
+    assert poller.update_interval == DEFAULT_INTERVAL
+
+    smartrent.echo_commands = False
+    await hass.services.async_call(
+        LOCK_DOMAIN,
+        SERVICE_LOCK,
+        {ATTR_ENTITY_ID: entity_id_of(hass, "lock", lock)},
+        blocking=True,
+    )
+    assert poller.update_interval == MIN_INTERVAL
+    # stays short while the command settles, even if nothing changes
+    await poller.async_refresh()
+    await poller.async_refresh()
+    assert poller.update_interval == MIN_INTERVAL
+
+
+async def test_falls_back_to_polling_and_returns_to_push(
+    hass: HomeAssistant, smartrent: FakeSmartRent, setup_integration
+) -> None:
+    lock = smartrent.add_lock()
+    switch = smartrent.add_binary_switch()
+    entry = await setup_integration()
+    hub: SmartRentHub = hass.data[DOMAIN][entry.entry_id].hub
+    lock_id = entity_id_of(hass, "lock", lock)
+    switch_id = entity_id_of(hass, "switch", switch)
+    await async_wait_subscribed(hass, entry)
+
+    # the websocket is blocked, the REST api still works
+    smartrent.accepting = False
+    smartrent.set_attribute(switch, "on", "true")
+    await smartrent.async_drop()
+    await async_wait_for(lambda: hub.polling)
+
+    # the first poll picks up what push missed
+    await async_wait_for(lambda: _state(hass, switch_id) == STATE_ON)
+    assert _state(hass, lock_id) == STATE_LOCKED
+    assert hub.requests[UPDATE_MODE_POLL] >= 1
+
+    smartrent.accepting = True
+    await async_wait_for(lambda: not hub.polling)
+    await async_wait_subscribed(hass, entry)
+
+    await hass.services.async_call(
+        LOCK_DOMAIN, SERVICE_UNLOCK, {ATTR_ENTITY_ID: lock_id}, blocking=True
+    )
+    await async_wait_for(lambda: _state(hass, lock_id) == STATE_UNLOCKED)
+    # updates arrive through push again, nothing is polled anymore
+    polls = hub.requests[UPDATE_MODE_POLL]
+    await smartrent.async_push(switch, "on", "false")
+    await async_wait_for(lambda: _state(hass, switch_id) != STATE_ON)
+    assert _state(hass, switch_id) != STATE_UNAVAILABLE
+    assert hub.requests[UPDATE_MODE_POLL] == polls
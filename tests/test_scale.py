@@ -0,0 +1,70 @@
+"""Boot a whole fleet against the fake backend and report how it scales."""
+import time
+import tracemalloc
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import EVENT_STATE_CHANGED, STATE_ON
+from homeassistant.core import Event, HomeAssistant, callback
+
+from . import async_wait_for, async_wait_subscribed, entity_id_of
+from .fake_smartrent import FakeSmartRent
+
+FLEET = {
+    "locks": 50,
+    "thermostats": 50,
+    "binary_switches": 50,
+    "multilevel_switches": 20,
+    "leak_sensors": 20,
+    "motion_sensors": 10,
+}
+EVENTS = 2000
+
+
+async def test_fleet_setup_memory_and_event_throughput(
+    hass: HomeAssistant, smartrent: FakeSmartRent, setup_integration, report
+) -> None:
+    devices = smartrent.add_fleet(**FLEET)
+    # toggled after the events, the websocket delivers them in order
+    sentinel = smartrent.add_binary_switch()
+    entities_before = len(hass.states.async_entity_ids())
+
+    tracemalloc.start()
+    try:
+        memory_before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        entry = await setup_integration()
+        setup_seconds = time.perf_counter() - start
+        memory = tracemalloc.get_traced_memory()[0] - memory_before
+    finally:
+        tracemalloc.stop()
+
+    assert entry.state is ConfigEntryState.LOADED
+    entities = len(hass.states.async_entity_ids()) - entities_before
+    # events for unavailable entities would not show in the state machine
+    await async_wait_subscribed(hass, entry)
+
+    changes = 0
+
+    @callback
+    def _async_state_changed(event: Event) -> None:
+        nonlocal changes
+        changes += 1
+
+    unsub = hass.bus.async_listen(EVENT_STATE_CHANGED, _async_state_changed)
+    start = time.perf_counter()
+    await smartrent.async_stream_events(EVENTS, device_ids=devices)
+    await smartrent.async_push(sentinel, "on", "true")
+    sentinel_id = entity_id_of(hass, "switch", sentinel)
+    await async_wait_for(lambda: hass.states.get(sentinel_id).state == STATE_ON)
+    event_seconds = time.perf_counter() - start
+    unsub()
+
+    # every event changes the state of at least one entity
+    assert changes > EVENTS
+    report["fleet devices"] = len(devices)
+    report["fleet entities"] = entities
+    report["fleet setup seconds"] = round(setup_seconds, 3)
+    report["memory per entity KiB (setup, traced)"] = round(memory / entities / 1024, 2)
+    report["events per second (websocket to state machine)"] = round(
+        EVENTS / event_seconds
+    )
@@ -0,0 +1,101 @@
+"""Tests for the pacing of SmartRent commands."""
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from homeassistant.components.lock import DOMAIN as LOCK_DOMAIN
+from homeassistant.const import ATTR_ENTITY_ID, SERVICE_UNLOCK, STATE_UNLOCKED
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+
+from custom_components.smartrent.const import DOMAIN
+from custom_components.smartrent.models import SmartRentData
+from custom_components.smartrent.scheduler import (
+    MAX_THROTTLED_RETRIES,
+    PRIORITY_LOCK,
+    CommandScheduler,
+)
+
+from . import async_wait_for, async_wait_subscribed, entity_id_of
+from .fake_smartrent import FakeSmartRent, InjectedThrottling
+
+FLEET_SIZE = 40
+
+
+@pytest.fixture(autouse=True)
+def short_backoff():
+    """Pause for a fraction of a second when SmartRent throttles."""
+    with patch("custom_components.smartrent.scheduler.MIN_BACKOFF_SECONDS", 0.05):
+        yield
+
+
+async def test_throttled_commands_run_exactly_once(
+    hass: HomeAssistant, smartrent: FakeSmartRent, setup_integration
+) -> None:
+    locks = smartrent.add_fleet(locks=FLEET_SIZE)
+    entry = await setup_integration()
+    data: SmartRentData = hass.data[DOMAIN][entry.entry_id]
+    await async_wait_subscribed(hass, entry)
+    # send far faster than SmartRent accepts
+    data.scheduler.rate = data.scheduler.max_rate = 100.0
+    data.scheduler.burst = FLEET_SIZE
+    smartrent.rate_limit = 20
+    entity_ids = [entity_id_of(hass, "lock", lock) for lock in locks]
+
+    await hass.services.async_call(
+        LOCK_DOMAIN, SERVICE_UNLOCK, {ATTR_ENTITY_ID: entity_ids}, blocking=True
+    )
+
+    assert smartrent.requests["throttled"] > 0
+    assert data.scheduler.throttled == smartrent.requests["throttled"]
+    assert data.scheduler.failed == 0
+    assert data.scheduler.sent == FLEET_SIZE
+    for lock in locks:
+        assert smartrent.commands_for(lock, "locked") == ["false"]
+    await async_wait_for(
+        lambda: all(
+            hass.states.get(entity_id).state == STATE_UNLOCKED
+            for entity_id in entity_ids
+        )
+    )
+
+
+async def test_command_fails_after_throttled_retries(hass: HomeAssistant) -> None:
+    scheduler = CommandScheduler(hass, rate=1000.0)
+    scheduler.async_start()
+    attempts = 0
+
+    async def _async_throttled() -> None:
+        nonlocal attempts
+        attempts += 1
+        raise InjectedThrottling("too many commands")
+
+    with pytest.raises(InjectedThrottling):
+        await scheduler.async_submit(PRIORITY_LOCK, _async_throttled)
+    scheduler.async_stop()
+
+    assert attempts == MAX_THROTTLED_RETRIES + 1
+    assert scheduler.failed == 1
+
+
+async def test_stop_fails_queued_and_in_flight_commands(hass: HomeAssistant) -> None:
+    scheduler = CommandScheduler(hass, workers=1)
+    scheduler.async_start()
+    sending = asyncio.Event()
+
+    async def _async_hang() -> None:
+        sending.set()
+        await asyncio.Event().wait()
+
+    in_flight = hass.async_create_task(
+        scheduler.async_submit(PRIORITY_LOCK, _async_hang)
+    )
+    queued = hass.async_create_task(scheduler.async_submit(PRIORITY_LOCK, _async_hang))
+    await sending.wait()
+    assert scheduler.queue_depth == 1
+
+    scheduler.async_stop()
+
+    for task in (in_flight, queued):
+        with pytest.raises(HomeAssistantError, match="stopped"):
+            await asyncio.wait_for(task, 1)
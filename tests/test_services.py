@@ -0,0 +1,134 @@
+"""Tests for the services of the SmartRent integration."""
+from homeassistant.const import ATTR_ENTITY_ID, STATE_UNLOCKED
+from homeassistant.core import HomeAssistant
+
+from custom_components.smartrent.const import (
+    CONF_UPDATE_MODE,
+    DOMAIN,
+    UPDATE_MODE_POLL,
+)
+from custom_components.smartrent.models import SmartRentData
+from custom_components.smartrent.poller import MIN_INTERVAL, SmartRentPoller
+from custom_components.smartrent.services import SERVICE_BULK_SET_LOCKED
+
+from . import entity_id_of
+from .fake_smartrent import FakeSmartRent
+
+FLEET_SIZE = 100
+
+
+async def test_bulk_unlock_fleet_with_failures(
+    hass: HomeAssistant, smartrent: FakeSmartRent, setup_integration, report
+) -> None:
+    locks = smartrent.add_fleet(locks=FLEET_SIZE)
+    entry = await setup_integration()
+    data: SmartRentData = hass.data[DOMAIN][entry.entry_id]
+    # measure the bulk executor, not the pacing of the command scheduler
+    data.scheduler.rate = data.scheduler.max_rate = 1000.0
+    data.scheduler.burst = FLEET_SIZE
+    data.hub.metrics.enabled = True
+
+    smartrent.latency = 0.01
+    failing = set(locks[:5])
+    flaky = set(locks[5:15])
+    smartrent.failing_devices = failing
+    smartrent.flaky_devices = dict.fromkeys(flaky, 1)
+    entity_ids = {lock: entity_id_of(hass, "lock", lock) for lock in locks}
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_BULK_SET_LOCKED,
+        {
+            ATTR_ENTITY_ID: list(entity_ids.values()),
+            "locked": False,
+            "max_concurrency": 5,
+            "retries": 2,
+        },
+        blocking=True,
+        return_response=True,
+    )
+    await hass.async_block_till_done()
+
+    assert response is not None
+    results = response["results"]
+    assert response["succeeded"] == FLEET_SIZE - len(failing)
+    assert response["failed"] == len(failing)
+    for lock, entity_id in entity_ids.items():
+        result = results[entity_id]
+        if lock in failing:
+            assert result["success"] is False
+            assert result["attempts"] == 3
+            assert "is failing" in result["error"]
+            assert smartrent.commands_for(lock) == []
+            continue
+
+        assert result["success"] is True
+        assert result["attempts"] == (2 if lock in flaky else 1)
+        assert smartrent.commands_for(lock, "locked") == ["false"]
+        assert hass.states.get(entity_id).state == STATE_UNLOCKED
+
+    assert smartrent.max_commands_in_flight <= 5
+    # every attempt is recorded like a command of the lock service
+    errors = len(flaky) + 3 * len(failing)
+    assert data.hub.metrics.total.commands == FLEET_SIZE - len(failing) + errors
+    assert data.hub.metrics.total.errors == errors
+    assert 0 < response["latency_p50"] <= response["latency_p95"]
+    assert response["throughput"] > 0
+    report["bulk unlock locks per second"] = round(response["throughput"], 1)
+    report["bulk unlock latency p50/p95 ms"] = (
+        round(response["latency_p50"] * 1e3, 1),
+        round(response["latency_p95"] * 1e3, 1),
+    )
+
+
+async def test_bulk_lock_times_out_slow_lock(
+    hass: HomeAssistant, smartrent: FakeSmartRent, setup_integration
+) -> None:
+    fast, slow = smartrent.add_lock(locked=False), smartrent.add_lock(locked=False)
+    await setup_integration()
+    smartrent.device_latency[slow] = 1.5
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_BULK_SET_LOCKED,
+        {
+            ATTR_ENTITY_ID: [
+                entity_id_of(hass, "lock", fast),
+                entity_id_of(hass, "lock", slow),
+            ],
+            "locked": True,
+            "retries": 0,
+            "timeout": 1,
+        },
+        blocking=True,
+        return_response=True,
+    )
+
+    assert response is not None
+    results = response["results"]
+    assert results[entity_id_of(hass, "lock", fast)]["success"] is True
+    slow_result = results[entity_id_of(hass, "lock", slow)]
+    assert slow_result["success"] is False
+    assert "TimeoutError" in slow_result["error"]
+    assert (response["succeeded"], response["failed"]) == (1, 1)
+
+
+async def test_bulk_lock_polls_sooner(
+    hass: HomeAssistant, smartrent: FakeSmartRent, setup_integration
+) -> None:
+    lock = smartrent.add_lock(locked=False)
+    entry = await setup_integration(**{CONF_UPDATE_MODE: UPDATE_MODE_POLL})
+    poller = hass.data[DOMAIN][entry.entry_id].hub.poller
+    assert isinstance(poller, SmartRentPoller)
+    assert poller.update_interval > MIN_INTERVAL
+
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_BULK_SET_LOCKED,
+        {ATTR_ENTITY_ID: [entity_id_of(hass, "lock", lock)], "locked": True},
+        blocking=True,
+        return_response=True,
+    )
+
+    assert smartrent.commands_for(lock, "locked") == ["true"]
+    assert poller.update_interval == MIN_INTERVAL